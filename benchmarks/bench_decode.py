@@ -0,0 +1,128 @@
+"""
+Decoding throughput and memory of the class_types models
+
+Usage: python benchmarks/bench_decode.py [--count 20000]
+"""
+
+import os
+import sys
+import json
+import gc
+import time
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from class_types import Serie, Movie
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def make_wanted(video: dict) -> dict:
+    # Wanted lists don't carry the existing subtitles
+    wanted = dict(video)
+    del wanted["subtitles"]
+    return wanted
+
+def make_episode(i: int) -> dict:
+    missing = [
+        {"name": name, "code2": code2, "code3": code3, "forced": False, "hi": False}
+        for name, code2, code3 in (("German", "de", "deu"), ("Spanish", "es", "spa"))
+    ]
+    return {
+        "sonarrEpisodeId": i,
+        "sonarrSeriesId": i // 20,
+        "monitored": i % 7 != 0,
+        "title": f"Episode {i}",
+        "seriesTitle": f"Series {i // 20}",
+        "episode_number": f"{i // 20 % 10 + 1}x{i % 20 + 1:02d}",
+        "episodeTitle": f"Some episode title {i}",
+        "missing_subtitles": missing,
+        "subtitles": [
+            {"name": "English", "code2": "en", "code3": "eng", "path": f"/tv/series {i // 20}/episode {i}.en.srt",
+             "forced": False, "hi": i % 5 == 0, "file_size": 30000 + i % 9000},
+        ],
+    }
+
+def make_movie(i: int) -> dict:
+    episode = make_episode(i)
+    return {
+        "radarrId": i,
+        "title": f"Movie {i}",
+        "monitored": episode["monitored"],
+        "path": f"/movies/movie {i}/movie {i}.mkv",
+        "missing_subtitles": episode["missing_subtitles"],
+        "subtitles": episode["subtitles"],
+    }
+
+def decode(cls, data: list, full: bool):
+    if full:
+        return [cls.from_dict(obj) for obj in data]
+    return [cls.from_dict(obj, full=False) for obj in data]
+
+def best_of(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - start)
+        finally:
+            gc.enable()
+    return best
+
+def bench(label: str, cls, raw: bytes, count: int, loads, full: bool):
+    parse_time = best_of(lambda: loads(raw))
+    data = loads(raw)["data"]
+    decode_time = best_of(lambda: decode(cls, data, full))
+
+    # Memory retained by the decoded objects, strings are shared with the parsed payload so they aren't counted
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = decode(cls, data, full)
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del objects
+
+    print(
+        f"{label:<28} parse {count / parse_time:>11,.0f} obj/s  decode {count / decode_time:>11,.0f} obj/s  "
+        f"total {count / (parse_time + decode_time):>11,.0f} obj/s  {retained / count:>6,.0f} B/obj"
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=20000, help="Number of objects per payload")
+    args = parser.parse_args()
+
+    payloads = [
+        ("episodes", Serie, json.dumps({"data": [make_episode(i) for i in range(args.count)]}).encode()),
+        ("wanted episodes", Serie, json.dumps({"data": [make_wanted(make_episode(i)) for i in range(args.count)]}).encode()),
+        ("movies", Movie, json.dumps({"data": [make_movie(i) for i in range(args.count)]}).encode()),
+        ("wanted movies", Movie, json.dumps({"data": [make_wanted(make_movie(i)) for i in range(args.count)]}).encode()),
+    ]
+    print(f"{args.count} objects per payload")
+
+    parsers = [("json", json.loads)]
+    if orjson is not None:
+        parsers.append(("orjson", orjson.loads))
+
+    # full=False isn't supported by older models, only benchmark it when available
+    modes = [True]
+    try:
+        Serie.from_dict(make_episode(0), full=False)
+        modes.append(False)
+    except TypeError:
+        pass
+
+    for parser_name, loads in parsers:
+        for full in modes:
+            for name, cls, raw in payloads:
+                bench(f"{name} {parser_name}{'' if full else ' lean'}", cls, raw, args.count, loads, full)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""
+Scan and translation throughput of the main.py pipeline against a fake Bazarr
+
+For each library size: wall time of a first scan and of a rescan (nothing changed),
+peak RSS of the process after the scans, throughput of the translation queue and
+translations per minute going through the dispatcher
+
+Every size runs in its own process so peak RSS isn't shared between sizes, the
+configuration of main.py (WANTED_PAGE_SIZE, NUM_WORKERS, ...) can be changed with
+the usual environment variables
+
+Usage: python benchmarks/bench_pipeline.py [--episodes 1000,10000,100000] [--json]
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import logging
+import argparse
+import resource
+import tempfile
+import subprocess
+from contextlib import AsyncExitStack
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from fake_bazarr import Library, FakeBazarr
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+async def measure_queue(task_queue) -> float:
+    """
+    Take every queued subtitle out of the queue and put them back, returns operations per second
+    """
+
+    count = len(task_queue)
+    if count == 0:
+        return 0
+
+    start = time.perf_counter()
+    items = []
+    for _ in range(count):
+        item = await task_queue.get()
+        task_queue.finished(item)
+        task_queue.done(item)
+        items.append(item)
+    for item in items:
+        task_queue.put(item)
+    return 3 * count / (time.perf_counter() - start)
+
+async def measure_translations(main, fake: FakeBazarr, queued: int, duration: float) -> tuple[int, float]:
+    """
+    Run the dispatcher until every queued subtitle is translated or duration passes
+
+    Returns the translations done and how long it took
+    """
+
+    before = fake.counters.get("translations", 0)
+    start = time.perf_counter()
+    dispatcher = asyncio.create_task(main.translation_dispatcher())
+    while time.perf_counter() - start < duration:
+        if fake.counters.get("translations", 0) - before >= queued:
+            break
+        await asyncio.sleep(0.01)
+    elapsed = time.perf_counter() - start
+    dispatcher.cancel()
+    await asyncio.gather(dispatcher, return_exceptions=True)
+    return fake.counters.get("translations", 0) - before, elapsed
+
+async def scan_all(main):
+    """
+    Scan every wanted list of every instance at the same time, like the scan loops of main()
+    """
+
+    scans = []
+    for instance in main.instances:
+        if instance.series_scan:
+            scans.append(main.scan_once(instance, True))
+        if instance.movies_scan:
+            scans.append(main.scan_once(instance, False))
+    await asyncio.gather(*scans)
+
+async def run(args) -> dict:
+    library = Library(args.episodes, args.movies, seed=args.seed)
+    fake = FakeBazarr(
+        library,
+        latency=args.latency,
+        failure_rate=args.failure_rate,
+        translation_latency=args.translation_latency,
+        translation_failure_rate=args.translation_failure_rate,
+        translation_capacity=args.translation_capacity,
+        seed=args.seed,
+    )
+    fake.start()
+
+    data_directory = tempfile.mkdtemp(prefix="bench_pipeline_")
+    os.environ.setdefault("DATA_DIRECTORY", data_directory)
+    os.environ.setdefault("BASE_LANGUAGES", "en")
+    os.environ.setdefault("TO_LANGUAGES", "de,es,fr")
+    os.environ.setdefault("NUM_WORKERS", "4")
+    os.environ["BAZARR_BASE_URL"] = fake.base_url
+    os.environ["BAZARR_API_KEY"] = "bench"
+    os.environ.pop("BAZARR_INSTANCES", None)
+    os.environ.pop("COORDINATION_PATH", None)
+    # Configuration is read when main is imported
+    import main
+    from structured_logging import setup_logging
+
+    logger = logging.getLogger("bazarr_lingarr")
+    logger.propagate = False
+    if args.log_level == "none":
+        logger.addHandler(logging.NullHandler())
+    else:
+        log_listener = setup_logging(logger, os.path.join(data_directory, "bench.log"), args.log_format)
+        logger.setLevel(args.log_level.upper())
+
+    main.resume_from_journal()
+    rss_before = peak_rss_mb()
+    try:
+        async with AsyncExitStack() as stack:
+            await main.open_instance_clients(stack)
+            start = time.perf_counter()
+            await scan_all(main)
+            scan = time.perf_counter() - start
+            rss = peak_rss_mb()
+
+            start = time.perf_counter()
+            await scan_all(main)
+            rescan = time.perf_counter() - start
+
+            queued = len(main.task_queue)
+            queue_ops = await measure_queue(main.task_queue)
+            translations, elapsed = await measure_translations(main, fake, queued, args.duration)
+    finally:
+        main.task_journal.close()
+        fake.stop()
+        if args.log_level != "none":
+            log_listener.stop()
+
+    return {
+        "episodes": args.episodes,
+        "movies": args.movies,
+        "wanted": len(library.episodes.wanted) + len(library.movies.wanted),
+        "queued": queued,
+        "scan_seconds": round(scan, 3),
+        "rescan_seconds": round(rescan, 3),
+        "peak_rss_mb": round(rss, 1),
+        "scan_rss_mb": round(rss - rss_before, 1),
+        "queue_ops_per_second": round(queue_ops),
+        "translations": translations,
+        "translations_per_minute": round(translations / elapsed * 60) if elapsed > 0 else 0,
+        "worker_limit": main.worker_limiter.current,
+        "requests": dict(sorted(fake.counters.items())),
+    }
+
+COLUMNS = [
+    ("episodes", "episodes", "{:>9,}"),
+    ("movies", "movies", "{:>8,}"),
+    ("wanted", "wanted", "{:>8,}"),
+    ("queued", "queued", "{:>8,}"),
+    ("scan s", "scan_seconds", "{:>8.2f}"),
+    ("rescan s", "rescan_seconds", "{:>8.2f}"),
+    ("peak MB", "peak_rss_mb", "{:>8.1f}"),
+    ("scan MB", "scan_rss_mb", "{:>8.1f}"),
+    ("queue ops/s", "queue_ops_per_second", "{:>11,}"),
+    ("transl/min", "translations_per_minute", "{:>10,}"),
+]
+
+def print_row(result: dict):
+    print("  ".join(fmt.format(result[key]) for _, key, fmt in COLUMNS))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--episodes", default="1000,10000,100000", help="Comma-separated library sizes, in episodes")
+    parser.add_argument("--movies-ratio", type=float, default=0.1, help="Movies per episode in the library")
+    parser.add_argument("--latency", type=float, default=0.002, help="Seconds every GET request takes")
+    parser.add_argument("--failure-rate", type=float, default=0, help="Share of GET requests failing with a 500")
+    parser.add_argument("--translation-latency", type=float, default=0.01, help="Seconds every translation takes")
+    parser.add_argument("--translation-failure-rate", type=float, default=0, help="Share of translations failing with a 500")
+    parser.add_argument("--translation-capacity", type=int, default=0, help="Translations at the same time above which the fake answers 503, 0 for no limit")
+    parser.add_argument("--duration", type=float, default=10, help="Maximum seconds spent translating per size")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the library and the failures")
+    parser.add_argument("--log-level", default="none", choices=["none", "debug", "info", "error"], help="Log to a file at that level")
+    parser.add_argument("--log-format", default="text", choices=["text", "json"], help="Format of the log file")
+    parser.add_argument("--json", action="store_true", help="Print one JSON object per size instead of a table")
+    parser.add_argument("--single", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single:
+        args.episodes = int(args.episodes)
+        args.movies = int(args.episodes * args.movies_ratio)
+        print(json.dumps(asyncio.run(run(args))))
+        return
+
+    if not args.json:
+        print("  ".join(f"{title:>{len(fmt.format(0))}}" for title, _, fmt in COLUMNS))
+
+    for episodes in (int(size) for size in args.episodes.split(",")):
+        command = [sys.executable, os.path.abspath(__file__), "--single", "--episodes", str(episodes)]
+        for name, value in vars(args).items():
+            if name not in ("episodes", "json", "single"):
+                command += [f"--{name.replace('_', '-')}", str(value)]
+        output = subprocess.run(command, cwd=ROOT, check=True, capture_output=True, text=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        if args.json:
+            print(json.dumps(result), flush=True)
+        else:
+            print_row(result)
+            sys.stdout.flush()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Throughput of the translation queue with many producers and consumers on one event loop
+
+Producers work like the scanner, they check a page of candidates against the queue then
+put the ones not already known, consumers work like the dispatcher, they take an item,
+finish it and mark it done one at a time. Every item goes through the queue once, the
+time it takes gives items per second, the time spent by producers alone gives the
+items per second of the scanner side
+
+Three variants are measured:
+- string: per item calls with the f-string keys used before TaskKey
+- tuple: per item calls with TaskKey
+- batch: check_many and put_many with TaskKey
+
+Usage: python benchmarks/bench_queue.py [--items 200000] [--producers 8] [--consumers 32] [--json]
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from unique_queue import AsyncUniquePriorityQueue, AsyncFairQueue
+from class_types import Subtitle, SubtitleTranslate, TaskKey
+
+LANGUAGES = ("de", "es", "fr", "it")
+
+def get_attr_or_key(obj, name):
+    if hasattr(obj, name):
+        return getattr(obj, name)
+    elif isinstance(obj, dict) and name in obj:
+        return obj[name]
+    else:
+        raise AttributeError(f"Missing attribute or key '{name}'")
+
+# Keys of main.py before TaskKey, the scanner checked throwaway dicts with them
+string_key = lambda x: f"{get_attr_or_key(x, "instance")} {"s" if get_attr_or_key(x, "is_serie") else "m"} {get_attr_or_key(x, "video_id")}_{get_attr_or_key(x, "to_language")}"
+tuple_key = lambda x: TaskKey(x.instance, x.is_serie, x.video_id, x.to_language)
+
+def make_items(count: int, groups: int) -> list[SubtitleTranslate]:
+    base = Subtitle("English", "en", "eng", "/tv/Series/Episode.en.srt", False, False, 50_000)
+    return [
+        SubtitleTranslate(base, LANGUAGES[i % len(LANGUAGES)], i // len(LANGUAGES), i % 3 != 0, True, instance=f"i{i % groups}" if groups > 1 else "")
+        for i in range(count)
+    ]
+
+def make_queue(key_fn, groups: int) -> AsyncFairQueue:
+    return AsyncFairQueue(
+        group_fn=lambda x: get_attr_or_key(x, "instance") if key_fn is string_key else x.instance,
+        make_queue=lambda group: AsyncUniquePriorityQueue(key_fn=key_fn, priority_fn=lambda x: (), max_wait=3600),
+    )
+
+async def run(variant: str, items: list[SubtitleTranslate], producers: int, consumers: int, batch: int, groups: int) -> tuple[float, float]:
+    """
+    Returns items per second through the queue and for the producers alone
+    """
+
+    key_fn = string_key if variant == "string" else tuple_key
+    queue = make_queue(key_fn, groups)
+    pages = [items[i:i + batch] for i in range(0, len(items), batch)]
+    remaining = len(items)
+    producing = 0.0
+    finished = asyncio.Event()
+
+    async def produce(pages: list[list[SubtitleTranslate]]):
+        nonlocal producing
+        for page in pages:
+            start = time.perf_counter()
+            if variant == "batch":
+                candidates = [TaskKey(sub.instance, sub.is_serie, sub.video_id, sub.to_language) for sub in page]
+                queue.put_many([sub for sub, known in zip(page, queue.check_many(candidates)) if not known])
+            else:
+                for sub in page:
+                    if variant == "string":
+                        candidate = {"instance": sub.instance, "is_serie": sub.is_serie, "video_id": sub.video_id, "to_language": sub.to_language}
+                    else:
+                        candidate = TaskKey(sub.instance, sub.is_serie, sub.video_id, sub.to_language)
+                    if not queue.check(candidate):
+                        queue.put(sub)
+            producing += time.perf_counter() - start
+            # Scanner pages are separated by requests, let the consumers run
+            await asyncio.sleep(0)
+
+    async def consume():
+        nonlocal remaining
+        # Like the dispatcher, every item is done on its own
+        while True:
+            sub = await queue.get()
+            queue.finished(sub)
+            queue.done(sub)
+            remaining -= 1
+            if remaining == 0:
+                finished.set()
+
+    start = time.perf_counter()
+    tasks = [asyncio.create_task(produce(pages[i::producers])) for i in range(producers)]
+    tasks += [asyncio.create_task(consume()) for _ in range(consumers)]
+    await finished.wait()
+    elapsed = time.perf_counter() - start
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return len(items) / elapsed, len(items) / producing
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=200_000, help="Items going through the queue")
+    parser.add_argument("--producers", type=int, default=8, help="Tasks putting items, like scan workers")
+    parser.add_argument("--consumers", type=int, default=32, help="Tasks taking items, like translation workers")
+    parser.add_argument("--batch", type=int, default=250, help="Items per page put by producers")
+    parser.add_argument("--groups", type=int, default=1, help="Instances the items are spread over")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per variant, the best one is kept")
+    parser.add_argument("--json", action="store_true", help="Print a JSON object instead of a table")
+    args = parser.parse_args()
+
+    items = make_items(args.items, args.groups)
+    results = {}
+    for variant in ("string", "tuple", "batch"):
+        runs = [asyncio.run(run(variant, items, args.producers, args.consumers, args.batch, args.groups)) for _ in range(args.repeat)]
+        results[variant] = {
+            "items_per_second": round(max(total for total, _ in runs)),
+            "put_items_per_second": round(max(put for _, put in runs)),
+        }
+
+    if args.json:
+        print(json.dumps({"items": args.items, "variants": results}))
+        return
+
+    baseline = results["string"]
+    print(f"{'variant':>8}  {'items/s':>10}  {'vs string':>9}  {'put items/s':>11}  {'vs string':>9}")
+    for variant, result in results.items():
+        total, put = result["items_per_second"], result["put_items_per_second"]
+        print(
+            f"{variant:>8}  {total:>10,}  {total / baseline['items_per_second']:>8.2f}x"
+            f"  {put:>11,}  {put / baseline['put_items_per_second']:>8.2f}x"
+        )
+
+if __name__ == "__main__":
+    main()
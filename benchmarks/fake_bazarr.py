@@ -0,0 +1,289 @@
+"""
+Synthetic Bazarr library and a fake Bazarr API serving it, used by the benchmarks
+
+The fake runs in a background thread of the benchmark process, it implements the
+endpoints used by main.py: GET /api/episodes, /api/episodes/wanted, /api/movies,
+/api/movies/wanted and PATCH /api/subtitles
+"""
+
+import json
+import random
+import threading
+import time
+from array import array
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+
+try:
+    # Keeps the fake's share of the CPU small, it runs in the same process as what is measured
+    from orjson import dumps as json_dumps
+except ImportError:
+    def json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
+
+# code2: (name, code3, probability of a video having a subtitle in it)
+LANGUAGES = {
+    "en": ("English", "eng", 0.8),
+    "fr": ("French", "fra", 0.25),
+    "es": ("Spanish", "spa", 0.2),
+    "de": ("German", "deu", 0.15),
+    "it": ("Italian", "ita", 0.1),
+    "pt": ("Portuguese", "por", 0.1),
+    "ja": ("Japanese", "jpn", 0.05),
+    "nl": ("Dutch", "nld", 0.05),
+}
+CODES = tuple(LANGUAGES)
+EPISODES_PER_SERIES = 24
+
+class Videos:
+    """
+    Subtitles of a synthetic set of episodes or movies, ids go from 0 to count - 1
+
+    Every video has a subtitle in each language with the probability of LANGUAGES, some
+    of them forced or hearing impaired, and a share of the videos has a languages profile
+    whose languages without a subtitle are missing (like Bazarr's wanted list)
+
+    Args:
+        count (int): Number of videos
+        profile (list[str]): Languages of the languages profile
+        profile_ratio (float): Share of the videos with the languages profile
+        seed (int): Seed of the generator, the same seed gives the same videos
+    """
+
+    def __init__(self, count: int, profile: list[str], profile_ratio: float, seed: int):
+        rng = random.Random(seed)
+        profile_mask = sum(1 << CODES.index(code) for code in profile)
+        # Bit masks of languages by video id, compact enough for 500k videos
+        self.existing = array("H", bytes(2 * count))
+        self.forced = array("H", bytes(2 * count))
+        self.hi = array("H", bytes(2 * count))
+        self.missing = array("H", bytes(2 * count))
+        self.file_sizes = array("I", bytes(4 * count))
+
+        for i in range(count):
+            existing = forced = hi = 0
+            for bit, (_, _, probability) in enumerate(LANGUAGES.values()):
+                if rng.random() < probability:
+                    existing |= 1 << bit
+                    if rng.random() < 0.05:
+                        forced |= 1 << bit
+                    elif rng.random() < 0.1:
+                        hi |= 1 << bit
+            self.existing[i] = existing
+            self.forced[i] = forced
+            self.hi[i] = hi
+            if rng.random() < profile_ratio:
+                self.missing[i] = profile_mask & ~existing
+            self.file_sizes[i] = rng.randint(20_000, 120_000)
+
+        self.wanted = array("I", (i for i in range(count) if self.missing[i]))
+
+    def __len__(self):
+        return len(self.existing)
+
+    def subtitles(self, i: int, path: str) -> list[dict]:
+        existing, forced, hi = self.existing[i], self.forced[i], self.hi[i]
+        subtitles = []
+        for bit, code in enumerate(CODES):
+            if existing & (1 << bit):
+                name, code3, _ = LANGUAGES[code]
+                subtitles.append({
+                    "name": name,
+                    "code2": code,
+                    "code3": code3,
+                    "path": f"{path}.{code}.srt",
+                    "forced": bool(forced & (1 << bit)),
+                    "hi": bool(hi & (1 << bit)),
+                    "file_size": self.file_sizes[i] + bit,
+                })
+        return subtitles
+
+    def missing_subtitles(self, i: int) -> list[dict]:
+        missing = self.missing[i]
+        return [
+            {"name": LANGUAGES[code][0], "code2": code, "code3": LANGUAGES[code][1], "forced": False, "hi": False}
+            for bit, code in enumerate(CODES) if missing & (1 << bit)
+        ]
+
+class Library:
+    """
+    Synthetic library of episodes and movies
+
+    Args:
+        episodes (int): Number of episodes
+        movies (int): Number of movies
+        profile (list[str]): Languages of the languages profile (default: de, es, fr, it)
+        profile_ratio (float): Share of the videos with the languages profile (default: 0.6)
+        seed (int): Seed of the generator (default: 0)
+    """
+
+    def __init__(
+        self,
+        episodes: int,
+        movies: int,
+        profile: list[str] = ["de", "es", "fr", "it"],
+        profile_ratio: float = 0.6,
+        seed: int = 0,
+    ):
+        self.episodes = Videos(episodes, profile, profile_ratio, seed)
+        self.movies = Videos(movies, profile, profile_ratio, seed + 1)
+
+    def episode(self, i: int, wanted: bool = False) -> dict:
+        series_id = i // EPISODES_PER_SERIES
+        path = f"/tv/Series {series_id}/Season 1/Episode {i}"
+        episode = {
+            "sonarrEpisodeId": i,
+            "sonarrSeriesId": series_id,
+            "monitored": i % 11 != 0,
+            "title": f"Series {series_id}",
+            "seriesTitle": f"Series {series_id}",
+            "episode_number": f"1x{i % EPISODES_PER_SERIES + 1:02d}",
+            "episodeTitle": f"Episode {i}",
+            "missing_subtitles": self.episodes.missing_subtitles(i),
+        }
+        # Wanted lists don't carry the existing subtitles
+        if not wanted:
+            episode["subtitles"] = self.episodes.subtitles(i, path)
+        return episode
+
+    def movie(self, i: int, wanted: bool = False) -> dict:
+        path = f"/movies/Movie {i}/Movie {i}"
+        movie = {
+            "radarrId": i,
+            "title": f"Movie {i}",
+            "monitored": i % 11 != 0,
+            "path": f"{path}.mkv",
+            "missing_subtitles": self.movies.missing_subtitles(i),
+        }
+        if not wanted:
+            movie["subtitles"] = self.movies.subtitles(i, path)
+        return movie
+
+class FakeBazarrHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "FakeBazarr"
+
+    def log_message(self, format, *args):
+        pass
+
+    def send(self, status: int, obj=None):
+        body = json_dumps(obj) if obj is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        library = self.server.library
+        if self.server.delay(url.path, self.server.latency, self.server.failure_rate):
+            return self.send(500, {"message": "Injected failure"})
+
+        match url.path:
+            case "/api/episodes/wanted":
+                return self.send(200, self.server.wanted(library.episodes, library.episode, query))
+            case "/api/movies/wanted":
+                return self.send(200, self.server.wanted(library.movies, library.movie, query))
+            case "/api/episodes":
+                ids = [int(i) for i in query.get("episodeid[]", []) if int(i) < len(library.episodes)]
+                return self.send(200, {"data": [library.episode(i) for i in ids]})
+            case "/api/movies":
+                ids = [int(i) for i in query.get("radarrid[]", []) if int(i) < len(library.movies)]
+                return self.send(200, {"data": [library.movie(i) for i in ids]})
+        self.send(404, {"message": "Not found"})
+
+    def do_PATCH(self):
+        url = urlsplit(self.path)
+        if url.path != "/api/subtitles":
+            return self.send(404, {"message": "Not found"})
+
+        # Like a translation backend that can only run so many translations at the same time
+        with self.server.lock:
+            self.server.translating += 1
+            overloaded = 0 < self.server.translation_capacity < self.server.translating
+        try:
+            failed = self.server.delay(url.path, self.server.translation_latency, self.server.translation_failure_rate)
+        finally:
+            with self.server.lock:
+                self.server.translating -= 1
+
+        if overloaded:
+            self.server.count("translations_overloaded")
+            return self.send(503, {"message": "Overloaded"})
+        self.server.count("translations_failed" if failed else "translations")
+        self.send(500 if failed else 204)
+
+class FakeBazarr(ThreadingHTTPServer):
+    """
+    Fake Bazarr API serving a Library on 127.0.0.1, from a background thread
+
+    Args:
+        library (Library): Library to serve
+        latency (float): Seconds every GET request takes (default: 0)
+        failure_rate (float): Share of GET requests answered with a 500 (default: 0)
+        translation_latency (float): Seconds every translation takes (default: 0)
+        translation_failure_rate (float): Share of translations answered with a 500 (default: 0)
+        translation_capacity (int): Translations running at the same time above which a 503 is answered, 0 for no limit (default: 0)
+        seed (int): Seed of the failures (default: 0)
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        library: Library,
+        latency: float = 0,
+        failure_rate: float = 0,
+        translation_latency: float = 0,
+        translation_failure_rate: float = 0,
+        translation_capacity: int = 0,
+        seed: int = 0,
+    ):
+        super().__init__(("127.0.0.1", 0), FakeBazarrHandler)
+        self.library = library
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.translation_latency = translation_latency
+        self.translation_failure_rate = translation_failure_rate
+        self.translation_capacity = translation_capacity
+        self.translating = 0
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.counters: dict[str, int] = {}
+        self.thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def count(self, name: str, amount: int = 1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def delay(self, endpoint: str, latency: float, failure_rate: float) -> bool:
+        """
+        Count a request, wait its latency and tell if it should fail
+        """
+
+        with self.lock:
+            self.counters[endpoint] = self.counters.get(endpoint, 0) + 1
+            failed = failure_rate > 0 and self.rng.random() < failure_rate
+        if latency > 0:
+            time.sleep(latency)
+        return failed
+
+    def wanted(self, videos: Videos, make, query: dict) -> dict:
+        start = int(query.get("start", ["0"])[0])
+        length = int(query.get("length", ["-1"])[0])
+        ids = videos.wanted[start:] if length < 0 else videos.wanted[start:start + length]
+        return {"data": [make(i, wanted=True) for i in ids], "total": len(videos.wanted)}
+
+    def start(self):
+        self.thread = threading.Thread(target=self.serve_forever, name="fake-bazarr", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
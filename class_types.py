@@ -1,4 +1,4 @@
-from typing import Any, List, TypeVar, Callable, Type, cast, Optional
+from typing import Any, List, NamedTuple, TypeVar, Callable, Type, cast, Optional
 
 T = TypeVar("T")
 
@@ -30,6 +30,14 @@ def from_union(fs, x):
             pass
     assert False
 
+def from_optional_str(x: Any) -> Optional[str]:
+    assert x is None or isinstance(x, str)
+    return x
+
+def from_optional_bool(x: Any) -> Optional[bool]:
+    assert x is None or isinstance(x, bool)
+    return x
+
 def to_class(c: Type[T], x: Any) -> dict:
     assert isinstance(x, c)
     return cast(Any, x).to_dict()
@@ -38,7 +46,15 @@ def is_type(t: Type[T], x: Any) -> T:
     assert isinstance(x, t)
     return x
 
+# Models use __slots__ and decode in a single pass without exceptions on optional
+# fields, wanted lists can hold thousands of them per scan
+#
+# Videos decoded with full=False skip the fields only used for display (titles),
+# that's what the scanner uses since it never reads them
+
 class MissingSubtitle:
+    __slots__ = ("name", "code2", "code3", "forced", "hi")
+
     name: str
     code2: str
     code3: str
@@ -55,12 +71,14 @@ class MissingSubtitle:
     @staticmethod
     def from_dict(obj: Any) -> 'MissingSubtitle':
         assert isinstance(obj, dict)
-        name = from_str(obj.get("name"))
-        code2 = from_str(obj.get("code2"))
-        code3 = from_str(obj.get("code3"))
-        forced = from_bool(obj.get("forced"))
-        hi = from_bool(obj.get("hi"))
-        return MissingSubtitle(name, code2, code3, forced, hi)
+        get = obj.get
+        return MissingSubtitle(
+            from_str(get("name")),
+            from_str(get("code2")),
+            from_str(get("code3")),
+            from_bool(get("forced")),
+            from_bool(get("hi")),
+        )
 
     def to_dict(self) -> dict:
         result: dict = {}
@@ -73,6 +91,8 @@ class MissingSubtitle:
 
 
 class Subtitle:
+    __slots__ = ("name", "code2", "code3", "path", "forced", "hi", "file_size")
+
     name: str
     code2: str
     code3: str
@@ -93,14 +113,16 @@ class Subtitle:
     @staticmethod
     def from_dict(obj: Any) -> 'Subtitle':
         assert isinstance(obj, dict)
-        name = from_str(obj.get("name"))
-        code2 = from_str(obj.get("code2"))
-        code3 = from_str(obj.get("code3"))
-        path = from_str(obj.get("path"))
-        forced = from_bool(obj.get("forced"))
-        hi = from_bool(obj.get("hi"))
-        file_size = from_int(obj.get("file_size"))
-        return Subtitle(name, code2, code3, path, forced, hi, file_size)
+        get = obj.get
+        return Subtitle(
+            from_str(get("name")),
+            from_str(get("code2")),
+            from_str(get("code3")),
+            from_str(get("path")),
+            from_bool(get("forced")),
+            from_bool(get("hi")),
+            from_int(get("file_size")),
+        )
 
     def to_dict(self) -> dict:
         result: dict = {}
@@ -114,7 +136,23 @@ class Subtitle:
         return result
 
 
+def from_subtitles(x: Any) -> Optional[List[Subtitle]]:
+    if x is None:
+        return None
+    assert isinstance(x, list)
+    return [Subtitle.from_dict(y) for y in x]
+
+def from_missing_subtitles(x: Any) -> List[MissingSubtitle]:
+    assert isinstance(x, list)
+    return [MissingSubtitle.from_dict(y) for y in x]
+
+
 class Serie:
+    __slots__ = (
+        "missing_subtitles", "monitored", "path", "sonarr_episode_id", "sonarr_series_id",
+        "subtitles", "title", "series_title", "episode_number", "episode_title",
+    )
+
     missing_subtitles: List[MissingSubtitle]
     monitored: Optional[bool]
     path: Optional[str]
@@ -126,9 +164,10 @@ class Serie:
     episode_number: Optional[str]
     episode_title: Optional[str]
 
-    def __init__(self, missing_subtitles: List[MissingSubtitle], monitored: Optional[bool], sonarr_episode_id: int, sonarr_series_id: int, subtitles: Optional[List[Subtitle]], title: Optional[str], series_title: Optional[str], episode_number: Optional[str], episode_title: Optional[str]) -> None:
+    def __init__(self, missing_subtitles: List[MissingSubtitle], monitored: Optional[bool], sonarr_episode_id: int, sonarr_series_id: int, subtitles: Optional[List[Subtitle]], title: Optional[str], series_title: Optional[str], episode_number: Optional[str], episode_title: Optional[str], path: Optional[str] = None) -> None:
         self.missing_subtitles = missing_subtitles
         self.monitored = monitored
+        self.path = path
         self.sonarr_episode_id = sonarr_episode_id
         self.sonarr_series_id = sonarr_series_id
         self.subtitles = subtitles
@@ -138,38 +177,43 @@ class Serie:
         self.episode_title = episode_title
 
     @staticmethod
-    def from_dict(obj: Any) -> 'Serie':
+    def from_dict(obj: Any, full: bool = True) -> 'Serie':
         assert isinstance(obj, dict)
-        missing_subtitles = from_list(MissingSubtitle.from_dict, obj.get("missing_subtitles"))
-        monitored = from_union([from_bool, from_none], obj.get("monitored"))
-        sonarr_episode_id = from_int(obj.get("sonarrEpisodeId"))
-        sonarr_series_id = from_int(obj.get("sonarrSeriesId"))
-        subtitles = from_union([lambda x: from_list(Subtitle.from_dict, x), from_none], obj.get("subtitles"))
-        title = from_union([from_str, from_none], obj.get("title"))
-        series_title = from_union([from_str, from_none], obj.get("seriesTitle"))
-        episode_number = from_union([from_str, from_none], obj.get("episode_number"))
-        episode_title = from_union([from_str, from_none], obj.get("episodeTitle"))
-        return Serie(missing_subtitles, monitored, sonarr_episode_id, sonarr_series_id, subtitles, title, series_title, episode_number, episode_title)
+        get = obj.get
+        missing_subtitles = from_missing_subtitles(get("missing_subtitles"))
+        monitored = from_optional_bool(get("monitored"))
+        sonarr_episode_id = from_int(get("sonarrEpisodeId"))
+        sonarr_series_id = from_int(get("sonarrSeriesId"))
+        subtitles = from_subtitles(get("subtitles"))
+        if not full:
+            return Serie(missing_subtitles, monitored, sonarr_episode_id, sonarr_series_id, subtitles, None, None, None, None)
+
+        title = from_optional_str(get("title"))
+        series_title = from_optional_str(get("seriesTitle"))
+        episode_number = from_optional_str(get("episode_number"))
+        episode_title = from_optional_str(get("episodeTitle"))
+        path = from_optional_str(get("path"))
+        return Serie(missing_subtitles, monitored, sonarr_episode_id, sonarr_series_id, subtitles, title, series_title, episode_number, episode_title, path)
 
     def to_dict(self) -> dict:
         result: dict = {}
         result["missing_subtitles"] = from_list(lambda x: to_class(MissingSubtitle, x), self.missing_subtitles)
         if self.monitored is not None:
-            result["monitored"] = from_union([from_bool, from_none], self.monitored)
+            result["monitored"] = from_bool(self.monitored)
         if self.path is not None:
-            result["path"] = from_union([from_str, from_none], self.path)
+            result["path"] = from_str(self.path)
         result["sonarrEpisodeId"] = from_int(self.sonarr_episode_id)
         result["sonarrSeriesId"] = from_int(self.sonarr_series_id)
         if self.subtitles is not None:
-            result["subtitles"] = from_union([lambda x: from_list(lambda x: to_class(Subtitle, x), x), from_none], self.subtitles)
+            result["subtitles"] = from_list(lambda x: to_class(Subtitle, x), self.subtitles)
         if self.title is not None:
-            result["title"] = from_union([from_str, from_none], self.title)
+            result["title"] = from_str(self.title)
         if self.series_title is not None:
-            result["seriesTitle"] = from_union([from_str, from_none], self.series_title)
+            result["seriesTitle"] = from_str(self.series_title)
         if self.episode_number is not None:
-            result["episode_number"] = from_union([from_str, from_none], self.episode_number)
+            result["episode_number"] = from_str(self.episode_number)
         if self.episode_title is not None:
-            result["episodeTitle"] = from_union([from_str, from_none], self.episode_title)
+            result["episodeTitle"] = from_str(self.episode_title)
         return result
 
 
@@ -181,14 +225,16 @@ def serie_to_dict(x: List[Serie]) -> Any:
     return from_list(lambda x: to_class(Serie, x), x)
 
 class Movie:
-    title: str
+    __slots__ = ("title", "missing_subtitles", "radarr_id", "monitored", "path", "subtitles")
+
+    title: Optional[str]
     missing_subtitles: List[MissingSubtitle]
     radarr_id: int
     monitored: Optional[bool]
     path: Optional[str]
     subtitles: Optional[List[Subtitle]]
 
-    def __init__(self, title: str, missing_subtitles: List[MissingSubtitle], radarr_id: int, monitored: Optional[bool], path: Optional[str], subtitles: Optional[List[Subtitle]]) -> None:
+    def __init__(self, title: Optional[str], missing_subtitles: List[MissingSubtitle], radarr_id: int, monitored: Optional[bool], path: Optional[str], subtitles: Optional[List[Subtitle]]) -> None:
         self.title = title
         self.missing_subtitles = missing_subtitles
         self.radarr_id = radarr_id
@@ -197,27 +243,32 @@ class Movie:
         self.subtitles = subtitles
 
     @staticmethod
-    def from_dict(obj: Any) -> 'Movie':
+    def from_dict(obj: Any, full: bool = True) -> 'Movie':
         assert isinstance(obj, dict)
-        title = from_str(obj.get("title"))
-        missing_subtitles = from_list(MissingSubtitle.from_dict, obj.get("missing_subtitles"))
-        radarr_id = from_int(obj.get("radarrId"))
-        monitored = from_union([from_bool, from_none], obj.get("monitored"))
-        path = from_union([from_str, from_none], obj.get("path"))
-        subtitles = from_union([lambda x: from_list(Subtitle.from_dict, x), from_none], obj.get("subtitles"))
+        get = obj.get
+        missing_subtitles = from_missing_subtitles(get("missing_subtitles"))
+        radarr_id = from_int(get("radarrId"))
+        monitored = from_optional_bool(get("monitored"))
+        subtitles = from_subtitles(get("subtitles"))
+        if not full:
+            return Movie(None, missing_subtitles, radarr_id, monitored, None, subtitles)
+
+        title = from_str(get("title"))
+        path = from_optional_str(get("path"))
         return Movie(title, missing_subtitles, radarr_id, monitored, path, subtitles)
 
     def to_dict(self) -> dict:
         result: dict = {}
-        result["title"] = from_str(self.title)
+        if self.title is not None:
+            result["title"] = from_str(self.title)
         result["missing_subtitles"] = from_list(lambda x: to_class(MissingSubtitle, x), self.missing_subtitles)
         result["radarrId"] = from_int(self.radarr_id)
         if self.monitored is not None:
-            result["monitored"] = from_union([from_bool, from_none], self.monitored)
+            result["monitored"] = from_bool(self.monitored)
         if self.path is not None:
-            result["path"] = from_union([from_str, from_none], self.path)
+            result["path"] = from_str(self.path)
         if self.subtitles is not None:
-            result["subtitles"] = from_union([lambda x: from_list(lambda x: to_class(Subtitle, x), x), from_none], self.subtitles)
+            result["subtitles"] = from_list(lambda x: to_class(Subtitle, x), self.subtitles)
         return result
 
 
@@ -229,21 +280,70 @@ def movie_to_dict(x: List[Movie]) -> Any:
     return from_list(lambda x: to_class(Movie, x), x)
 
 class SubtitleTranslate:
+    __slots__ = ("base_subtitle", "to_language", "video_id", "is_serie", "monitored", "attempts", "instance", "forced", "hi")
+
     base_subtitle: Subtitle
     to_language: str
     video_id: int
     is_serie: bool
+    monitored: Optional[bool]
+    attempts: int
+    instance: str
+    # Flags of the missing subtitle, the translation is saved with them whatever the source's
+    forced: bool
+    hi: bool
 
-    def __init__(self, base_subtitle: Subtitle, to_language: str, video_id: int, is_serie: bool) -> None:
+    def __init__(self, base_subtitle: Subtitle, to_language: str, video_id: int, is_serie: bool, monitored: Optional[bool] = None, attempts: int = 0, instance: str = "", forced: Optional[bool] = None, hi: Optional[bool] = None) -> None:
         self.base_subtitle = base_subtitle
         self.to_language = to_language
         self.video_id = video_id
         self.is_serie = is_serie
+        self.monitored = monitored
+        self.attempts = attempts
+        self.instance = instance
+        self.forced = base_subtitle.forced if forced is None else forced
+        self.hi = base_subtitle.hi if hi is None else hi
+
+    @staticmethod
+    def from_dict(obj: Any) -> 'SubtitleTranslate':
+        assert isinstance(obj, dict)
+        base_subtitle = Subtitle.from_dict(obj.get("base_subtitle"))
+        to_language = from_str(obj.get("to_language"))
+        video_id = from_int(obj.get("video_id"))
+        is_serie = from_bool(obj.get("is_serie"))
+        monitored = from_optional_bool(obj.get("monitored"))
+        attempts = obj.get("attempts") or 0
+        assert isinstance(attempts, int)
+        instance = from_str(obj.get("instance", ""))
+        # Tasks journaled before the flags were kept have the ones of their source
+        forced = from_optional_bool(obj.get("forced"))
+        hi = from_optional_bool(obj.get("hi"))
+        return SubtitleTranslate(base_subtitle, to_language, video_id, is_serie, monitored, attempts, instance, forced, hi)
 
     def to_dict(self):
         return {
             "base_subtitle": self.base_subtitle.to_dict(),
             "to_language": self.to_language,
             "video_id": self.video_id,
-            "is_serie": self.is_serie
-        }
\ No newline at end of file
+            "is_serie": self.is_serie,
+            "monitored": self.monitored,
+            "attempts": self.attempts,
+            "instance": self.instance,
+            "forced": self.forced,
+            "hi": self.hi
+        }
+
+
+class TaskKey(NamedTuple):
+    """
+    Key of a translation in the queue, a subtitle of a video in a language
+    """
+
+    instance: str
+    is_serie: bool
+    video_id: int
+    to_language: str
+
+    def __str__(self) -> str:
+        # Key in the journal and the coordination database, same format as before keys were tuples
+        return f"{self.instance} {'s' if self.is_serie else 'm'} {self.video_id}_{self.to_language}"
@@ -0,0 +1,57 @@
+import time
+import asyncio
+
+class AdaptiveLimiter:
+    """
+    Concurrency limit adjusted with AIMD (additive increase, multiplicative decrease)
+
+    Every healthy request that finishes while the limit is fully used grows the limit by
+    1 / limit, so about one more slot per limit requests, an overloaded one cuts it by
+    backoff, once per overload since requests started before a cut don't cut it again
+
+    With min_limit equal to max_limit it's a fixed limit
+
+    Args:
+        min_limit (int): Lowest limit, also the starting one
+        max_limit (int): Highest limit
+        backoff (float): Factor applied to the limit on overload (default: 0.5)
+    """
+
+    def __init__(self, min_limit: int, max_limit: int, backoff: float = 0.5):
+        self.min_limit = max(min_limit, 1)
+        self.max_limit = max(max_limit, self.min_limit)
+        self.backoff = backoff
+        self.limit = float(self.min_limit)
+        self.in_flight = 0
+        self.decreased_at = 0.0
+        self.changed = asyncio.Event()
+
+    @property
+    def current(self) -> int:
+        return min(max(int(self.limit), self.min_limit), self.max_limit)
+
+    async def acquire(self):
+        while self.in_flight >= self.current:
+            self.changed.clear()
+            await self.changed.wait()
+
+        self.in_flight += 1
+
+    def release(self, started: float, overloaded: bool | None):
+        """
+        Give back a slot and adjust the limit
+
+        Args:
+            started (float): time.monotonic() when the request was sent
+            overloaded (bool | None): Whether the request showed an overload, None when it tells nothing
+        """
+
+        saturated = self.in_flight >= self.current
+        self.in_flight -= 1
+        if overloaded:
+            if started >= self.decreased_at:
+                self.limit = max(self.limit * self.backoff, self.min_limit)
+                self.decreased_at = time.monotonic()
+        elif overloaded is not None and saturated:
+            self.limit = min(self.limit + 1 / self.limit, self.max_limit)
+        self.changed.set()
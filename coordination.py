@@ -0,0 +1,141 @@
+import os
+import time
+import sqlite3
+from typing import Protocol
+from rate_limiter import SqliteUsageStore
+
+class Coordinator(Protocol):
+    """
+    Where replicas claim translations so only one of them sends each one
+
+    A claim is a lease owned by a replica, active leases are kept alive by heartbeat()
+    and expire lease_ttl seconds after the last one, so the work of a replica that died
+    is taken over, a released lease can be held a while longer so a translation that
+    just succeeded or failed for good isn't sent again by another replica meanwhile
+    """
+
+    def open(self): ...
+
+    def close(self): ...
+
+    def claim(self, key: str) -> bool: ...
+
+    def heartbeat(self): ...
+
+    def release(self, key: str, hold: float = 0): ...
+
+class LocalCoordinator:
+    """
+    Coordinator of a single replica, every claim succeeds
+    """
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def claim(self, key: str) -> bool:
+        return True
+
+    def heartbeat(self):
+        pass
+
+    def release(self, key: str, hold: float = 0):
+        pass
+
+class SqliteCoordinator(SqliteUsageStore):
+    """
+    Coordinator storing leases in a SQLite database shared by the replicas
+
+    The database also keeps the translation usage of all the replicas, so it can be the
+    store of a SpendBudget and the budgets hold for the replicas together
+
+    Fine for replicas on the same host or sharing a local volume, SQLite locking
+    isn't reliable on network file systems like NFS or SMB
+
+    Args:
+        path (str): Path of the database
+        replica_id (str): Name of this replica, unique among the replicas
+        lease_ttl (float): Seconds an active lease lasts without a heartbeat
+    """
+
+    def __init__(self, path: str, replica_id: str, lease_ttl: float):
+        self.path = path
+        self.replica_id = replica_id
+        self.lease_ttl = lease_ttl
+        self.conn: sqlite3.Connection | None = None
+
+    def open(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Other replicas write too, wait for their transactions instead of failing right away
+        self.conn = sqlite3.connect(self.path, timeout=5)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS leases ("
+            "key TEXT PRIMARY KEY, owner TEXT NOT NULL, active INTEGER NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS leases_owner ON leases (owner, active)")
+        self.create_usage_table()
+        self.conn.commit()
+
+    def close(self):
+        if self.conn is None:
+            return
+
+        # Let the other replicas take over right away
+        self.conn.execute("DELETE FROM leases WHERE owner = ? AND active = 1", (self.replica_id,))
+        self.conn.commit()
+        self.conn.close()
+        self.conn = None
+
+    def claim(self, key: str) -> bool:
+        """
+        Take the lease of a key, fails if another replica holds it and it didn't expire
+
+        Args:
+            key (str): Task key
+        """
+
+        now = time.time()
+        cursor = self.conn.execute(
+            "INSERT INTO leases (key, owner, active, expires_at) VALUES (?, ?, 1, ?) "
+            "ON CONFLICT (key) DO UPDATE SET owner = excluded.owner, active = 1, expires_at = excluded.expires_at "
+            "WHERE leases.expires_at < ? OR leases.owner = excluded.owner",
+            (key, self.replica_id, now + self.lease_ttl, now),
+        )
+        self.conn.commit()
+        return cursor.rowcount == 1
+
+    def heartbeat(self):
+        """
+        Extend the active leases of this replica and forget the expired ones of everyone
+        """
+
+        now = time.time()
+        self.conn.execute(
+            "UPDATE leases SET expires_at = ? WHERE owner = ? AND active = 1", (now + self.lease_ttl, self.replica_id)
+        )
+        self.conn.execute("DELETE FROM leases WHERE expires_at < ?", (now,))
+        self.conn.commit()
+
+    def release(self, key: str, hold: float = 0):
+        """
+        Give back the lease of a key
+
+        Args:
+            key (str): Task key
+            hold (float): Seconds other replicas still can't claim the key (default: 0)
+        """
+
+        if hold > 0:
+            self.conn.execute(
+                "UPDATE leases SET active = 0, expires_at = ? WHERE key = ? AND owner = ?",
+                (time.time() + hold, key, self.replica_id),
+            )
+        else:
+            self.conn.execute("DELETE FROM leases WHERE key = ? AND owner = ?", (key, self.replica_id))
+        self.conn.commit()
@@ -0,0 +1,109 @@
+import json
+import asyncio
+import logging
+from urllib.parse import urlsplit, parse_qs
+from typing import Awaitable, Callable
+
+logger = logging.getLogger("bazarr_lingarr")
+
+MAX_BODY_SIZE = 1024 * 1024
+REASONS = {200: "OK", 202: "Accepted", 400: "Bad Request", 401: "Unauthorized", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+class Request:
+    def __init__(self, method: str, target: str, headers: dict[str, str], body: bytes):
+        url = urlsplit(target)
+        self.method = method
+        self.path = url.path
+        self.query = parse_qs(url.query)
+        self.headers = headers
+        self.body = body
+
+    def json(self):
+        return json.loads(self.body)
+
+class Response:
+    def __init__(self, status: int = 200, body: bytes | str = b"", content_type: str = "text/plain; charset=utf-8"):
+        self.status = status
+        self.body = body.encode() if isinstance(body, str) else body
+        self.content_type = content_type
+
+Handler = Callable[[Request], Awaitable[Response]]
+
+class HttpServer:
+    """
+    Minimal HTTP/1.1 server running on the event loop, one request per connection
+
+    Only meant for small local endpoints (webhooks, metrics), not for serving anything big
+    """
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self.routes: dict[str, dict[str, Handler]] = {}
+        self.server: asyncio.Server | None = None
+
+    def route(self, method: str, path: str, handler: Handler):
+        self.routes.setdefault(path, {})[method.upper()] = handler
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        if self.port == 0:
+            self.port = self.server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        if self.server is None:
+            return
+
+        self.server.close()
+        await self.server.wait_closed()
+        self.server = None
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            response = await self.handle_request(reader)
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError, ValueError):
+            response = Response(400, "Bad request")
+        except Exception as e:
+            logger.error("Error while handling HTTP request: %s", e)
+            response = Response(500, "Internal error")
+
+        try:
+            writer.write(
+                f"HTTP/1.1 {response.status} {REASONS.get(response.status, 'Unknown')}\r\n"
+                f"Content-Type: {response.content_type}\r\n"
+                f"Content-Length: {len(response.body)}\r\n"
+                "Connection: close\r\n\r\n".encode() + response.body
+            )
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def handle_request(self, reader: asyncio.StreamReader) -> Response:
+        request_line = (await reader.readuntil(b"\r\n")).decode("latin-1").rstrip("\r\n")
+        method, target, _ = request_line.split(" ", 2)
+
+        headers: dict[str, str] = {}
+        while True:
+            line = (await reader.readuntil(b"\r\n")).decode("latin-1").rstrip("\r\n")
+            if line == "":
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        length = int(headers.get("content-length", 0))
+        if length > MAX_BODY_SIZE:
+            return Response(413, "Payload too large")
+        body = await reader.readexactly(length) if length > 0 else b""
+
+        request = Request(method.upper(), target, headers, body)
+        handlers = self.routes.get(request.path)
+        if handlers is None:
+            return Response(404, "Not found")
+
+        handler = handlers.get(request.method)
+        if handler is None:
+            return Response(405, "Method not allowed")
+
+        return await handler(request)
@@ -0,0 +1,62 @@
+import re
+import httpx
+from typing import List
+from source_selection import SourceSelector
+
+def env_prefix(name: str) -> str:
+    """
+    Prefix of the environment variables of an instance, "4k" reads 4K_BAZARR_BASE_URL and so on
+    """
+
+    return re.sub(r"[^0-9A-Za-z]+", "_", name).upper() + "_"
+
+class Instance:
+    """
+    A Bazarr server with its own languages, scans and share of the translation workers
+
+    The instance without a name is the one configured by the global variables when
+    BAZARR_INSTANCES isn't set, its dedup keys are the same as before instances existed
+    """
+
+    def __init__(
+        self,
+        name: str,
+        base_url: str | None,
+        api_key: str | None,
+        base_languages: List[str],
+        to_languages: List[str],
+        series_scan: bool,
+        movies_scan: bool,
+        num_workers: int,
+        source_rules: List[str],
+        min_source_size: int,
+    ):
+        self.name = name
+        self.base_url = base_url
+        self.api_key = api_key
+        self.base_languages = base_languages
+        self.to_languages = to_languages
+        self.to_language_set = frozenset(to_languages)
+        self.source_rules = source_rules
+        self.min_source_size = min_source_size
+        self.source_selector = SourceSelector(base_languages, source_rules, min_source_size)
+        self.series_scan = series_scan
+        self.movies_scan = movies_scan
+        self.num_workers = num_workers
+        # Fingerprint of the wanted entry of every video processed by a previous scan, keyed by (is_serie, video_id)
+        self.scan_fingerprints: dict[tuple[bool, int], int] = {}
+        # Set while running, see create_bazarr_client
+        self.client: httpx.AsyncClient | None = None
+        self.translation_client: httpx.AsyncClient | None = None
+
+    @property
+    def tag(self) -> str:
+        """
+        Prefix of log messages about the instance, empty for the unnamed one
+        """
+
+        return f"[Instance: {self.name}] " if self.name else ""
+
+    @property
+    def env_prefix(self) -> str:
+        return env_prefix(self.name) if self.name else ""
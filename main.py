@@ -1,59 +1,320 @@
 import os
 import sys
 import httpx
-import queue
+import time
+import zlib
 import signal
+import socket
+import sqlite3
 import asyncio
 import logging
-import threading
 from dotenv import load_dotenv
-from typing import List, Optional
-from unique_queue import UniqueQueue
-from logging.handlers import TimedRotatingFileHandler
-from class_types import Serie, Movie, SubtitleTranslate
+from typing import AsyncIterator, Awaitable, Callable, List, Optional
+from contextlib import AsyncExitStack
+from unique_queue import AsyncUniquePriorityQueue, AsyncFairQueue
+from task_journal import TaskJournal, QUEUED, IN_FLIGHT, SUCCEEDED, FAILED, SPILLED
+from rate_limiter import TokenBucket, SpendBudget, CircuitBreaker, UsageStore
+from concurrency import AdaptiveLimiter
+from coordination import Coordinator, LocalCoordinator, SqliteCoordinator
+from retry_policy import RetryPolicy, classify_error
+from http_server import HttpServer
+from webhook import WebhookCoalescer, add_webhook_route
+from metrics import registry, error_label, add_metrics_route
+from structured_logging import Payload, setup_logging
+from instances import Instance, env_prefix
+from source_selection import SOURCE_RULES
+from negative_cache import NegativeCache
+from scan_scheduler import ScanSchedule, next_scan_time
+from class_types import Serie, Movie, MissingSubtitle, SubtitleTranslate, TaskKey
+
+try:
+    # Optional, noticeably faster on big wanted lists
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
 
 def get_env_or_default(env, default):
     val = os.getenv(env)
     return val if val is not None else default
 
-def get_attr_or_key(obj, name):
-    if hasattr(obj, name):
-        return getattr(obj, name)
-    elif isinstance(obj, dict) and name in obj:
-        return obj[name]
-    else:
-        raise AttributeError(f"Missing attribute or key '{name}'")
+def get_bool_env_or_default(env, default):
+    val = os.getenv(env)
+    return val.strip().lower() in ("1", "true", "yes", "on") if val is not None else default
+
+def get_instance_env_or_default(instance_name, env, default):
+    # Named instances read <NAME>_<ENV> first, then the global <ENV>
+    if instance_name:
+        val = os.getenv(f"{env_prefix(instance_name)}{env}")
+        if val is not None:
+            return val
+    return get_env_or_default(env, default)
+
+def get_instance_bool_env_or_default(instance_name, env, default):
+    if instance_name:
+        return get_bool_env_or_default(f"{env_prefix(instance_name)}{env}", get_bool_env_or_default(env, default))
+    return get_bool_env_or_default(env, default)
+
+def parse_languages(val):
+    return [lang.strip() for lang in val.split(",")] if val is not None else []
+
+def parse_rules(val):
+    return [rule.strip().lower() for rule in val.split(",") if rule.strip()] if val is not None else []
 
 # Get configuration and setup things
 load_dotenv()
-base_languages_env = os.getenv("BASE_LANGUAGES")
-if base_languages_env is not None:
-    base_languages = [lang.strip() for lang in base_languages_env.split(",")]
-else:
-    base_languages = []
-
-to_languges_env = os.getenv("TO_LANGUAGES")
-if to_languges_env is not None:
-    to_languges = [lang.strip() for lang in to_languges_env.split(",")]
-else:
-    to_languges = []
-
+# Bazarr servers, languages and scans are read by load_instances
 translation_request_timeout = int(get_env_or_default("TRANSLATION_REQUEST_TIMEOUT", 15 * 60))
 num_workers = int(get_env_or_default("NUM_WORKERS", 1))
+adaptive_workers = get_bool_env_or_default("ADAPTIVE_WORKERS", False)
+min_workers = int(get_env_or_default("MIN_WORKERS", 1))
+workers_latency_target = float(get_env_or_default("WORKERS_LATENCY_TARGET", 0))
 interval_between_scans = int(get_env_or_default("INTERVAL_BETWEEN_SCANS", 5 * 60))
+series_interval_between_scans = int(get_env_or_default("SERIES_INTERVAL_BETWEEN_SCANS", interval_between_scans))
+movies_interval_between_scans = int(get_env_or_default("MOVIES_INTERVAL_BETWEEN_SCANS", interval_between_scans))
+scan_backoff_limit = float(get_env_or_default("SCAN_BACKOFF_LIMIT", 6))
+scan_jitter = float(get_env_or_default("SCAN_JITTER", 0.1))
 log_level = get_env_or_default("LOG_LEVEL", "INFO")
 log_directory = get_env_or_default("LOG_DIRECTORY", "logs/")
-series_scan = bool(get_env_or_default("SERIES_SCAN", True))
-movies_scan = bool(get_env_or_default("MOVIES_SCAN", True))
+log_format = get_env_or_default("LOG_FORMAT", "text").lower()
+log_payload_limit = int(get_env_or_default("LOG_PAYLOAD_LIMIT", 2000))
+http_max_connections = int(get_env_or_default("HTTP_MAX_CONNECTIONS", 20))
+http_max_keepalive_connections = int(get_env_or_default("HTTP_MAX_KEEPALIVE_CONNECTIONS", 10))
+http_keepalive_expiry = float(get_env_or_default("HTTP_KEEPALIVE_EXPIRY", 60))
+http2 = get_bool_env_or_default("HTTP2", False)
+wanted_page_size = int(get_env_or_default("WANTED_PAGE_SIZE", 250))
+metadata_chunk_size = int(get_env_or_default("METADATA_CHUNK_SIZE", 50))
+metadata_concurrency = int(get_env_or_default("METADATA_CONCURRENCY", 4))
+scan_workers = int(get_env_or_default("SCAN_WORKERS", 2))
+scan_buffer_pages = int(get_env_or_default("SCAN_BUFFER_PAGES", 2))
+data_directory = get_env_or_default("DATA_DIRECTORY", "data/")
+journal_batch_size = int(get_env_or_default("JOURNAL_BATCH_SIZE", 200))
+journal_retention = int(get_env_or_default("JOURNAL_RETENTION", 24 * 60 * 60))
+negative_cache_ttl = int(get_env_or_default("NEGATIVE_CACHE_TTL", 6 * 60 * 60))
+negative_cache_size = int(get_env_or_default("NEGATIVE_CACHE_SIZE", 100_000))
+negative_cache_persist = get_bool_env_or_default("NEGATIVE_CACHE_PERSIST", True)
+full_scan_every = int(get_env_or_default("FULL_SCAN_EVERY", 12))
+translations_per_minute = float(get_env_or_default("TRANSLATIONS_PER_MINUTE", 0))
+daily_translation_limit = int(get_env_or_default("DAILY_TRANSLATION_LIMIT", 0))
+monthly_translation_limit = int(get_env_or_default("MONTHLY_TRANSLATION_LIMIT", 0))
+daily_translation_bytes_limit = int(get_env_or_default("DAILY_TRANSLATION_BYTES_LIMIT", 0))
+monthly_translation_bytes_limit = int(get_env_or_default("MONTHLY_TRANSLATION_BYTES_LIMIT", 0))
+circuit_breaker_threshold = int(get_env_or_default("CIRCUIT_BREAKER_THRESHOLD", 5))
+circuit_breaker_cooldown = int(get_env_or_default("CIRCUIT_BREAKER_COOLDOWN", 5 * 60))
+priority_rules = parse_rules(os.getenv("PRIORITY_RULES"))
+priority_max_wait = int(get_env_or_default("PRIORITY_MAX_WAIT", 60 * 60))
+queue_capacity = int(get_env_or_default("QUEUE_CAPACITY", 0))
+lanes = parse_rules(os.getenv("LANES"))
+lane_workers = int(get_env_or_default("LANE_WORKERS", 0))
+lane_limits = {
+    name.strip().lower(): int(limit)
+    for name, _, limit in (entry.partition(":") for entry in get_env_or_default("LANE_LIMITS", "").split(",") if entry.strip())
+}
+lane_stealing = get_bool_env_or_default("LANE_STEALING", True)
+translation_max_attempts = int(get_env_or_default("TRANSLATION_MAX_ATTEMPTS", 3))
+retry_base_delay = int(get_env_or_default("RETRY_BASE_DELAY", 60))
+retry_max_delay = int(get_env_or_default("RETRY_MAX_DELAY", 60 * 60))
+dead_letter_ttl = int(get_env_or_default("DEAD_LETTER_TTL", 7 * 24 * 60 * 60))
+webhook_host = get_env_or_default("WEBHOOK_HOST", "0.0.0.0")
+webhook_port = int(get_env_or_default("WEBHOOK_PORT", 0))
+webhook_token = os.getenv("WEBHOOK_TOKEN")
+webhook_coalesce_window = float(get_env_or_default("WEBHOOK_COALESCE_WINDOW", 10))
+metrics_host = get_env_or_default("METRICS_HOST", "0.0.0.0")
+metrics_port = int(get_env_or_default("METRICS_PORT", 0))
+coordination_path = get_env_or_default("COORDINATION_PATH", "")
+replica_id = get_env_or_default("REPLICA_ID", socket.gethostname())
+lease_ttl = int(get_env_or_default("LEASE_TTL", 60))
+instance_names = [name.strip() for name in os.getenv("BAZARR_INSTANCES", "").split(",") if name.strip()]
+
+def load_instances() -> List[Instance]:
+    """
+    Instances listed in BAZARR_INSTANCES, or a single unnamed one configured by the global variables
+    """
+
+    instances = []
+    for name in instance_names or [""]:
+        instances.append(Instance(
+            name,
+            base_url=get_instance_env_or_default(name, "BAZARR_BASE_URL", None),
+            api_key=get_instance_env_or_default(name, "BAZARR_API_KEY", None),
+            base_languages=parse_languages(get_instance_env_or_default(name, "BASE_LANGUAGES", None)),
+            to_languages=parse_languages(get_instance_env_or_default(name, "TO_LANGUAGES", None)),
+            series_scan=get_instance_bool_env_or_default(name, "SERIES_SCAN", True),
+            movies_scan=get_instance_bool_env_or_default(name, "MOVIES_SCAN", True),
+            num_workers=int(get_instance_env_or_default(name, "NUM_WORKERS", num_workers)),
+            source_rules=parse_rules(get_instance_env_or_default(name, "SOURCE_RULES", ",".join(SOURCE_RULES))),
+            min_source_size=int(get_instance_env_or_default(name, "MIN_SOURCE_SIZE", 0)),
+        ))
+    return instances
+
+instances = load_instances()
+instances_by_name = {instance.name: instance for instance in instances}
+
+# str() of a key is its key in the journal
+key_fn = lambda x: TaskKey(x.instance, x.is_serie, x.video_id, x.to_language)
+PRIORITY_RULES = ("episodes", "movies", "size", "language", "monitored")
+
+def translation_priority(sub: SubtitleTranslate) -> tuple:
+    """
+    Priority of a subtitle in the translation queue, lowest first, following PRIORITY_RULES in order
+    """
+
+    ranks = []
+    for rule in priority_rules:
+        match rule:
+            case "episodes":
+                ranks.append(0 if sub.is_serie else 1)
+            case "movies":
+                ranks.append(1 if sub.is_serie else 0)
+            case "size":
+                ranks.append(sub.base_subtitle.file_size)
+            case "language":
+                languages = instances_by_name[sub.instance].to_languages
+                ranks.append(languages.index(sub.to_language) if sub.to_language in languages else len(languages))
+            case "monitored":
+                ranks.append(0 if sub.monitored else 1)
+    return tuple(ranks)
+
+LANE_RULES = ("language", "type")
 
-key_fn = lambda x: f" {"s" if get_attr_or_key(x, "is_serie") else "m"} {get_attr_or_key(x, "video_id")}_{get_attr_or_key(x, "to_language")}"
-task_queue = UniqueQueue(key_fn=key_fn)
+def translation_lane(x) -> str:
+    """
+    Lane of a subtitle or a key following LANES, like "ja" or "ja/episode"
+    """
+
+    parts = []
+    for rule in lanes:
+        match rule:
+            case "language":
+                parts.append(x.to_language)
+            case "type":
+                parts.append("episode" if x.is_serie else "movie")
+    return "/".join(parts)
+
+def create_instance_queue(instance_name: str) -> AsyncUniquePriorityQueue | AsyncFairQueue:
+    """
+    Queue of the subtitles of an instance, a priority queue per lane served round robin when LANES is set
+
+    Args:
+        instance_name (str): Name of the instance
+    """
+
+    create_priority_queue = lambda lane: AsyncUniquePriorityQueue(key_fn=key_fn, priority_fn=translation_priority, max_wait=priority_max_wait)
+    if len(lanes) == 0:
+        return create_priority_queue("")
+
+    # A lane past its limit still gets idle workers when the other lanes are empty, unless LANE_STEALING is off
+    return AsyncFairQueue(
+        group_fn=translation_lane,
+        make_queue=create_priority_queue,
+        shares=lane_limits,
+        default_share=lane_workers,
+        steal=lane_stealing,
+    )
+
+# A queue per instance, served round robin, each instance has at most its NUM_WORKERS translations in flight,
+# groups of items and of keys are both their instance
+task_queue = AsyncFairQueue(
+    group_fn=lambda x: x.instance,
+    make_queue=create_instance_queue,
+    shares={instance.name: instance.num_workers for instance in instances},
+)
+task_journal = TaskJournal(os.path.join(data_directory, "journal.sqlite3"), batch_size=journal_batch_size)
+# How long tasks in each state stay in the journal, and are skipped by the scanner
+journal_ttls = {
+    QUEUED: float("inf"),
+    SPILLED: float("inf"),
+    IN_FLIGHT: translation_request_timeout,
+    SUCCEEDED: journal_retention,
+    FAILED: dead_letter_ttl,
+}
+# Videos whose missing subtitles had no source to translate from, skipped without fetching their metadata
+negative_cache = NegativeCache(
+    negative_cache_ttl,
+    negative_cache_size,
+    os.path.join(data_directory, "negative_cache.json") if negative_cache_persist else None,
+)
+retry_policy = RetryPolicy(translation_max_attempts, retry_base_delay, retry_max_delay)
+token_bucket = TokenBucket(translations_per_minute)
+# Replicas sharing COORDINATION_PATH each translate a different part of the wanted subtitles,
+# and share the spend budget through it
+coordinator: Coordinator = LocalCoordinator()
+usage_store: UsageStore = task_journal
+if coordination_path:
+    coordinator = usage_store = SqliteCoordinator(coordination_path, replica_id, lease_ttl)
+spend_budget = SpendBudget(
+    usage_store,
+    daily_count=daily_translation_limit,
+    monthly_count=monthly_translation_limit,
+    daily_bytes=daily_translation_bytes_limit,
+    monthly_bytes=monthly_translation_bytes_limit,
+)
+circuit_breaker = CircuitBreaker(circuit_breaker_threshold, circuit_breaker_cooldown)
+worker_limiter = AdaptiveLimiter(min_workers if adaptive_workers else num_workers, num_workers)
 shutdown_event = asyncio.Event()
 logger = logging.getLogger("bazarr_lingarr")
 
+# Metrics, served on METRICS_PORT, video types are "episode" or "movie"
+scan_duration = registry.histogram(
+    "bazarr_autotranslate_scan_duration_seconds", "Duration of a whole wanted list scan", ("type",)
+)
+scan_phase_duration = registry.histogram(
+    "bazarr_autotranslate_scan_phase_duration_seconds",
+    "Duration of a scan phase for one page of the wanted list (wanted_fetch, metadata_fetch, matching)",
+    ("type", "phase"),
+)
+scans_total = registry.counter("bazarr_autotranslate_scans_total", "Scans of a wanted list", ("type",))
+scan_items = registry.counter(
+    "bazarr_autotranslate_scan_items_total",
+    "Videos discovered, unchanged since last scan or without source (cached), missing subtitles skipped or queued for translation",
+    ("type", "result"),
+)
+registry.gauge("bazarr_autotranslate_queue_depth", "Subtitles waiting in the translation queue", function=lambda: len(task_queue))
+registry.gauge(
+    "bazarr_autotranslate_queue_keys",
+    "Subtitles known to the translation queue, waiting, in flight or waiting for a retry",
+    function=lambda: task_queue.keys,
+)
+registry.gauge(
+    "bazarr_autotranslate_queue_spilled",
+    "Subtitles queued on disk only, waiting for room in the translation queue",
+    function=lambda: len(task_journal.spilled),
+)
+registry.gauge(
+    "bazarr_autotranslate_worker_limit", "Translations allowed at the same time", function=lambda: worker_limiter.current
+)
+translations_in_flight = registry.gauge(
+    "bazarr_autotranslate_translations_in_flight", "Translations in flight per worker", ("worker",)
+)
+translation_duration = registry.histogram(
+    "bazarr_autotranslate_translation_duration_seconds",
+    "Duration of translation requests",
+    ("language", "type", "result"),
+    buckets=(1, 5, 10, 30, 60, 120, 300, 600, 900, 1800, 3600),
+)
+request_errors = registry.counter(
+    "bazarr_autotranslate_request_errors_total", "Failed Bazarr requests by HTTP status", ("endpoint", "status")
+)
+claims = registry.counter(
+    "bazarr_autotranslate_claims_total", "Translations claimed by this replica or left to another one", ("result",)
+)
+
+def video_type(is_serie: bool) -> str:
+    return "episode" if is_serie else "movie"
+
+def task_fields(sub: SubtitleTranslate, worker_id: int | None = None) -> dict:
+    """
+    Fields of a subtitle added to log records, shown with LOG_FORMAT=json
+    """
+
+    fields = {"video_id": sub.video_id, "type": video_type(sub.is_serie), "language": sub.to_language}
+    if sub.instance:
+        fields["instance"] = sub.instance
+    if worker_id is not None:
+        fields["worker"] = worker_id
+    return fields
+
 async def get_episodes_metadata(
-    base_url: str,
-    api_key: str,
+    client: httpx.AsyncClient,
     series_ids: Optional[List[int]] = None,
     episode_ids: Optional[List[int]] = None,
 ) -> List[Serie] | None:
@@ -61,15 +322,13 @@ async def get_episodes_metadata(
     Get metadata for episodes/series
 
     Args:
-        base_url (str): Base URL of Bazarr API
-        api_key (str): API key for authentication
+        client (httpx.AsyncClient): Shared Bazarr client, see create_bazarr_client
         series_ids (list[int], optional): List of series IDs to get metadata for
         episode_ids (list[int], optional): List of episode IDs to get metadata for
     """
 
-    logger.debug(f"Getting metadata for series: {series_ids}, episodes: {episode_ids}")
-    endpoint = f"{base_url}/api/episodes"
-    headers = {"X-API-KEY": api_key}
+    logger.debug("Getting metadata for series: %s, episodes: %s", Payload(series_ids, log_payload_limit), Payload(episode_ids, log_payload_limit))
+    endpoint = "/api/episodes"
 
     params = {}
     if series_ids:
@@ -78,19 +337,18 @@ async def get_episodes_metadata(
         params["episodeid[]"] = episode_ids
 
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(endpoint, headers=headers, params=params)
-            response.raise_for_status()
-            json = response.json()["data"]
-            
-            logger.debug(f"received: {json}")
-            return [Serie.from_dict(obj) for obj in json]
+        response = await client.get(endpoint, params=params)
+        response.raise_for_status()
+        json = json_loads(response.content)["data"]
+
+        logger.debug("received: %s", Payload(json, log_payload_limit))
+        return [Serie.from_dict(obj, full=False) for obj in json]
     except Exception as e:
-        logger.error(f"Error while getting metada: {e}")
+        request_errors.inc(endpoint=endpoint, status=error_label(e))
+        logger.error("Error while getting metada: %s", e)
 
 async def get_wanted_episodes(
-    base_url: str,
-    api_key: str,
+    client: httpx.AsyncClient,
     start: int = 0,
     length: int = -1,
 ) -> List[Serie] | None:
@@ -98,65 +356,61 @@ async def get_wanted_episodes(
     Get wanted subtitles for episodes
 
     Args:
-        base_url (str): Base URL of Bazarr API
-        api_key (str): API key for authentication
+        client (httpx.AsyncClient): Shared Bazarr client, see create_bazarr_client
         start (int): Paging start integer (default: 0)
         length (int): Paging length integer (default: -1)
         episode_ids (list[int], optional): List of specific episode IDs to check
     """
 
-    logger.debug(f"Getting wanted episodes")
-    endpoint = f"{base_url}/api/episodes/wanted"
-    headers = {"X-API-KEY": api_key}
+    logger.debug("Getting wanted episodes")
+    endpoint = "/api/episodes/wanted"
     params = {"start": start, "length": length}
 
+    started = time.monotonic()
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(endpoint, headers=headers, params=params)
-            response.raise_for_status()
-            json = response.json()["data"]
-            
-            logger.debug(f"received: {json}")
-            return [Serie.from_dict(obj) for obj in json]
+        response = await client.get(endpoint, params=params)
+        response.raise_for_status()
+        json = json_loads(response.content)["data"]
+        scan_phase_duration.observe(time.monotonic() - started, type="episode", phase="wanted_fetch")
+
+        logger.debug("received: %s", Payload(json, log_payload_limit))
+        return [Serie.from_dict(obj, full=False) for obj in json]
     except Exception as e:
-        logger.error(f"Error while getting wanted episodes: {e}")
+        request_errors.inc(endpoint=endpoint, status=error_label(e))
+        logger.error("Error while getting wanted episodes: %s", e)
 
 async def get_movies_metadata(
-    base_url: str,
-    api_key: str,
+    client: httpx.AsyncClient,
     movie_ids: Optional[List[int]] = None,
 ) -> List[Movie] | None:
     """
     Get metadata for movies
 
     Args:
-        base_url (str): Base URL of Bazarr API
-        api_key (str): API key for authentication
+        client (httpx.AsyncClient): Shared Bazarr client, see create_bazarr_client
         movie_ids (list[int], optional): List of movie IDs to get metadata for
     """
 
-    logger.debug(f"Getting metada for moveis: {movie_ids}")
-    endpoint = f"{base_url}/api/movies"
-    headers = {"X-API-KEY": api_key}
+    logger.debug("Getting metada for moveis: %s", Payload(movie_ids, log_payload_limit))
+    endpoint = "/api/movies"
     params = {}
 
     if movie_ids:
         params["radarrid[]"] = movie_ids
 
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(endpoint, headers=headers, params=params)
-            response.raise_for_status()
-            json = response.json()["data"]
-            
-            logger.debug(f"received: {json}")
-            return [Movie.from_dict(obj) for obj in json]
+        response = await client.get(endpoint, params=params)
+        response.raise_for_status()
+        json = json_loads(response.content)["data"]
+
+        logger.debug("received: %s", Payload(json, log_payload_limit))
+        return [Movie.from_dict(obj, full=False) for obj in json]
     except Exception as e:
-        logger.error(f"Error while getting movies metada: {e}")
+        request_errors.inc(endpoint=endpoint, status=error_label(e))
+        logger.error("Error while getting movies metada: %s", e)
 
 async def get_wanted_movies(
-    base_url: str,
-    api_key: str,
+    client: httpx.AsyncClient,
     start: int = 0,
     length: int = -1,
 ) -> List[Movie] | None:
@@ -164,233 +418,960 @@ async def get_wanted_movies(
     Get wanted subtitles for movies
 
     Args:
-        base_url (str): Base URL of Bazarr API
-        api_key (str): API key for authentication
+        client (httpx.AsyncClient): Shared Bazarr client, see create_bazarr_client
         start (int): Paging start integer (default: 0)
         length (int): Paging length integer (default: -1)
     """
 
-    logger.debug(f"Getting wanted movies")
-    endpoint = f"{base_url}/api/movies/wanted"
-    headers = {"X-API-KEY": api_key}
+    logger.debug("Getting wanted movies")
+    endpoint = "/api/movies/wanted"
     params = {"start": start, "length": length}
 
+    started = time.monotonic()
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(endpoint, headers=headers, params=params)
-            response.raise_for_status()
-            json = response.json()["data"]
-            
-            logger.debug(f"received: {json}")
-            return [Movie.from_dict(obj) for obj in json]
+        response = await client.get(endpoint, params=params)
+        response.raise_for_status()
+        json = json_loads(response.content)["data"]
+        scan_phase_duration.observe(time.monotonic() - started, type="movie", phase="wanted_fetch")
+
+        logger.debug("received: %s", Payload(json, log_payload_limit))
+        return [Movie.from_dict(obj, full=False) for obj in json]
     except Exception as e:
-        logger.error(f"Error while getting metada for movies: {e}")
+        request_errors.inc(endpoint=endpoint, status=error_label(e))
+        logger.error("Error while getting metada for movies: %s", e)
+
+async def get_videos_metadata(
+    client: httpx.AsyncClient,
+    is_serie: bool,
+    video_ids: List[int],
+) -> dict[int, Serie | Movie]:
+    """
+    Get metadata for episodes or movies in chunks fetched concurrently
+
+    A chunk that fails only skips its own ids, the others are still returned
+
+    Args:
+        client (httpx.AsyncClient): Shared Bazarr client, see create_bazarr_client
+        is_serie (bool): Whether the ids are episode ids or movie ids
+        video_ids (list[int]): List of episode or movie IDs to get metadata for
+    """
+
+    chunk_size = max(metadata_chunk_size, 1)
+    chunks = [video_ids[i:i + chunk_size] for i in range(0, len(video_ids), chunk_size)]
+    semaphore = asyncio.Semaphore(max(metadata_concurrency, 1))
+
+    async def fetch_chunk(chunk: List[int]) -> List[Serie] | List[Movie] | None:
+        async with semaphore:
+            if is_serie:
+                return await get_episodes_metadata(client, episode_ids=chunk)
+            return await get_movies_metadata(client, movie_ids=chunk)
+
+    started = time.monotonic()
+    results = await asyncio.gather(*(fetch_chunk(chunk) for chunk in chunks))
+    scan_phase_duration.observe(time.monotonic() - started, type=video_type(is_serie), phase="metadata_fetch")
+
+    video_id_to_video_map: dict[int, Serie | Movie] = {}
+    for chunk, metadata in zip(chunks, results):
+        if metadata is None:
+            logger.info("No metadata returned for %d videos, skipping them for this scan", len(chunk))
+            continue
+
+        for video in metadata:
+            video_id = video.sonarr_episode_id if isinstance(video, Serie) else video.radarr_id
+            video_id_to_video_map[video_id] = video
+
+    return video_id_to_video_map
+
+def video_fingerprint(video: Serie | Movie) -> int:
+    missing = frozenset((sub.code2, sub.forced, sub.hi) for sub in video.missing_subtitles)
+    subtitles = frozenset((sub.code2, sub.forced, sub.hi, sub.path) for sub in video.subtitles or [])
+    return hash((missing, subtitles))
+
+def wanted_fingerprint(video: Serie | Movie) -> int:
+    """
+    Fingerprint of the missing subtitles of a video, the same in every process unlike hash()
+    """
+
+    missing = sorted(f"{sub.code2}:{sub.forced:d}{sub.hi:d}" for sub in video.missing_subtitles)
+    return zlib.crc32(",".join(missing).encode())
 
-async def find_base_language_subtitles_from_missing_sutitles(base_url, api_key, videos: List[Serie] | List[Movie]) -> List[SubtitleTranslate] | None:
-    # Making a video id to language map, useful later on
-    video_id_language_map = {}
+def filter_changed_videos(
+    instance: Instance, videos: List[Serie] | List[Movie], seen: set[tuple[bool, int]]
+) -> List[Serie] | List[Movie]:
+    """
+    Keep only the videos that are new or whose wanted entry changed since they were last processed
+
+    Args:
+        instance (Instance): Instance the videos are from
+        videos (List[Serie] | List[Movie]): Videos from the wanted list
+        seen (set[tuple[bool, int]]): Keys of the videos seen during the current scan, updated in place
+    """
+
+    changed = []
+    for video in videos:
+        is_serie = isinstance(video, Serie)
+        key = (is_serie, video.sonarr_episode_id if is_serie else video.radarr_id)
+        seen.add(key)
+
+        fingerprint = video_fingerprint(video)
+        if instance.scan_fingerprints.get(key) == fingerprint:
+            continue
+
+        instance.scan_fingerprints[key] = fingerprint
+        changed.append(video)
+
+    return changed
+
+def prune_fingerprints(instance: Instance, is_serie: bool, seen: set[tuple[bool, int]]):
+    # Videos that left the wanted list are processed again if they ever come back
+    for key in [key for key in instance.scan_fingerprints if key[0] == is_serie and key not in seen]:
+        del instance.scan_fingerprints[key]
+
+def forget_fingerprint(instance: Instance, is_serie: bool, video_id: int):
+    instance.scan_fingerprints.pop((is_serie, video_id), None)
+
+def clear_fingerprints(instance: Instance, is_serie: bool):
+    for key in [key for key in instance.scan_fingerprints if key[0] == is_serie]:
+        del instance.scan_fingerprints[key]
+
+async def iter_wanted_pages(
+    client: httpx.AsyncClient,
+    get_wanted: Callable[..., Awaitable[List[Serie] | List[Movie] | None]],
+    page_size: int = wanted_page_size,
+) -> AsyncIterator[List[Serie] | List[Movie]]:
+    """
+    Walk a wanted list page by page so each page can be processed as soon as it arrives
+
+    Args:
+        client (httpx.AsyncClient): Shared Bazarr client, see create_bazarr_client
+        get_wanted (Callable): get_wanted_episodes or get_wanted_movies
+        page_size (int): Number of items per page, 0 or less fetches everything in one request
+    """
+
+    if page_size <= 0:
+        videos = await get_wanted(client)
+        if videos:
+            yield videos
+        return
+
+    start = 0
+    while True:
+        videos = await get_wanted(client, start=start, length=page_size)
+        if not videos:
+            return
+
+        yield videos
+        if len(videos) < page_size:
+            return
+        start += page_size
+
+async def find_base_language_subtitles_from_missing_sutitles(
+    instance: Instance,
+    videos: List[Serie] | List[Movie],
+    metadata: dict[int, Serie | Movie] | None = None,
+) -> List[SubtitleTranslate] | None:
+    """
+    Match the missing subtitles of videos with existing subtitles in a base language
+
+    Args:
+        instance (Instance): Instance the videos are from
+        videos (List[Serie] | List[Movie]): Videos with missing subtitles, all episodes or all movies
+        metadata (dict[int, Serie | Movie], optional): Metadata of the videos by id when already fetched
+    """
+
+    # Making a video id to missing subtitles by language map, useful later on
+    started = time.monotonic()
+    is_serie = isinstance(videos[0], Serie)
+    skipped = 0
+    cached = 0
+    candidates: List[tuple[TaskKey, MissingSubtitle]] = []
+    fingerprints: dict[int, int] = {}
     for video in videos:
         # Get video id from correct property depending the video instance
-        video_id = video.sonarr_episode_id if isinstance(video, Serie) else video.radarr_id
+        video_id = video.sonarr_episode_id if is_serie else video.radarr_id
+        if negative_cache.enabled:
+            fingerprint = fingerprints[video_id] = wanted_fingerprint(video)
+            # Already fetched metadata is looked at again, webhooks are usually about a new subtitle
+            if metadata is None and negative_cache.contains((instance.name, is_serie, video_id), fingerprint):
+                cached += 1
+                continue
+
         for missing_sub in video.missing_subtitles:
             # Check if the missing subtitle is in the list for language to be translated in
-            if missing_sub.code2 in to_languges:
-                # Check if that subtitle is already in the translation list
-                if task_queue.check({"is_serie": isinstance(video, Serie), "video_id": video_id, "to_language": missing_sub.code2}):
-                    logger.debug(f"Skipping subtitle, already in translation queue, {missing_sub.to_dict()}")
-                    continue
+            if missing_sub.code2 in instance.to_language_set:
+                candidates.append((TaskKey(instance.name, is_serie, video_id, missing_sub.code2), missing_sub))
 
-                video_id_language_map[video_id] = missing_sub.code2
+    # Check if those subtitles are already in the translation list, all at once
+    in_queue = task_queue.check_many([key for key, _ in candidates])
+    video_id_language_map: dict[int, dict[str, MissingSubtitle]] = {}
+    for (key, missing_sub), queued in zip(candidates, in_queue):
+        if queued:
+            logger.debug("Skipping subtitle, already in translation queue, %s", Payload(missing_sub, log_payload_limit))
+            skipped += 1
+            continue
+
+        # Check if that subtitle is still being translated, was translated recently, maybe before a restart,
+        # or kept failing
+        if task_journal.should_skip(str(key), journal_ttls):
+            logger.debug("Skipping subtitle, recently requested or failed according to journal, %s", Payload(missing_sub, log_payload_limit))
+            # Looked at again by the next scans, it's queued once its state expires and not at the next full scan
+            forget_fingerprint(instance, is_serie, key.video_id)
+            skipped += 1
+            continue
 
+        # A language is translated once, the first missing entry decides the flags of its source
+        video_id_language_map.setdefault(key.video_id, {}).setdefault(key.to_language, missing_sub)
+
+    scan_items.inc(skipped, type=video_type(is_serie), result="skipped")
+    scan_items.inc(cached, type=video_type(is_serie), result="cached")
+    matching = time.monotonic() - started
     if len(video_id_language_map) == 0:
-        logger.info("No missing subtitles found that is in list of languages to be translated")
+        scan_phase_duration.observe(matching, type=video_type(is_serie), phase="matching")
+        logger.info("%sNo missing subtitles found that is in list of languages to be translated", instance.tag)
         return
 
-    metadata: List[Serie] | List[Movie] | None = None
-    if isinstance(videos[0], Serie):
-        metadata = await get_episodes_metadata(
-            base_url, api_key, episode_ids=list(video_id_language_map.keys())
-        )
+    if metadata is not None:
+        video_id_to_video_map = metadata
     else:
-        metadata = await get_movies_metadata(base_url, api_key, movie_ids=list(video_id_language_map.keys()))
+        video_id_to_video_map = await get_videos_metadata(instance.client, is_serie, list(video_id_language_map.keys()))
 
-    if metadata is None:
-        logger.info("No metadata returned, couldn't find already existing subtitles")
+    # Videos without metadata weren't really processed, look at them again next scan
+    for video_id in video_id_language_map:
+        if video_id not in video_id_to_video_map:
+            forget_fingerprint(instance, is_serie, video_id)
+
+    if len(video_id_to_video_map) == 0:
+        scan_phase_duration.observe(matching, type=video_type(is_serie), phase="matching")
+        logger.info("%sNo metadata returned, couldn't find already existing subtitles", instance.tag)
         return
-    
-    video_id_to_video_map: dict[int, Serie | Movie] = {}
-    for video in metadata:
-        video_id = video.sonarr_episode_id if isinstance(video, Serie) else video.radarr_id
-        video_id_to_video_map[video_id] = video
-    
+
     # Check the metadata for already existing subtitles
     # Match the existing subtitles from base language list to the missing ones for translation
+    started = time.monotonic()
     subtitles_to_translate = []
-    for video_id, language in video_id_language_map.items():
-        # Get the video associated
-        video = video_id_to_video_map[video_id]
+    for video_id, languages in video_id_language_map.items():
+        # Get the video associated, it can be missing if its metadata chunk failed
+        video = video_id_to_video_map.get(video_id)
+        if video is None:
+            continue
 
         # Check if there is subtitles
+        found = len(subtitles_to_translate)
         if video.subtitles is None:
-            logger.debug(f"skipping video: {video_id} no current existing subtitles found")
-            continue
+            logger.debug("skipping video: %s no current existing subtitles found", video_id)
+        else:
+            # Every missing language gets its own translation, all from the same index of the existing subtitles
+            sources = instance.source_selector.index(video.subtitles)
+            for language, missing_sub in languages.items():
+                sub = instance.source_selector.select(sources, missing_sub)
+                if sub is None:
+                    logger.debug("No matching existing subtitle found for: %s for video: %s", language, video_id)
+                    continue
 
-        found = False
-        for sub in video.subtitles:
-            if language == sub.code2:
-                continue # Skip metadata for subtitle if it's in the same language to for the translation
-                # I don't think this should happen but better safe than sorry
-
-            # If the subtitle is in the base language list, associate it with the language to translate in
-            if sub.code2 in base_languages:
-                subtitles_to_translate.append(SubtitleTranslate(sub, language, video_id, isinstance(video, Serie)))
-                found = True
-                break
-
-        if not found:
-            logger.debug(f"No matching existing subtitle found for: {language} for video: {video_id}")
-    
+                subtitles_to_translate.append(
+                    SubtitleTranslate(
+                        sub, language, video_id, is_serie, video.monitored,
+                        instance=instance.name, forced=missing_sub.forced, hi=missing_sub.hi,
+                    )
+                )
+
+        # Nothing to translate from yet, don't fetch its metadata again until NEGATIVE_CACHE_TTL passes
+        if video_id in fingerprints:
+            if len(subtitles_to_translate) == found:
+                negative_cache.add((instance.name, is_serie, video_id), fingerprints[video_id])
+            else:
+                negative_cache.discard((instance.name, is_serie, video_id))
+
+    matching += time.monotonic() - started
+    scan_phase_duration.observe(matching, type=video_type(is_serie), phase="matching")
     if len(subtitles_to_translate) == 0:
-        logger.info("No already existing subtitles matched with requested translation subs")
+        logger.info("%sNo already existing subtitles matched with requested translation subs", instance.tag)
         return
 
-    logger.debug(f"Matching subtitles: {[w.to_dict() for w in subtitles_to_translate]}")
-    logger.info(f"Found {len(subtitles_to_translate)} matching subtitles to translate")
+    logger.debug("Matching subtitles: %s", Payload(subtitles_to_translate, log_payload_limit))
+    logger.info("%sFound %d matching subtitles to translate", instance.tag, len(subtitles_to_translate))
     return subtitles_to_translate
 
-def queue_subtitles_for_translation(subtitles: List[SubtitleTranslate]):
-    for sub in subtitles:
-        task_queue.put(sub)
-        logger.info(f"Queued: {sub.base_subtitle.path} to be translated to in: {sub.to_language}")
+def queue_room() -> int:
+    return max(queue_capacity - len(task_queue), 0) if queue_capacity > 0 else sys.maxsize
+
+def queue_subtitles_for_translation(subtitles: List[SubtitleTranslate]) -> int:
+    """
+    Queue subtitles for translation, those that don't fit in QUEUE_CAPACITY are spilled to the journal
+
+    Returns the number of subtitles queued or spilled
+
+    Args:
+        subtitles (List[SubtitleTranslate]): Subtitles to queue, all episodes or all movies
+    """
+
+    room = queue_room()
+    queued = []
+    for sub in task_queue.put_many(subtitles[:room]):
+        queued.append((str(key_fn(sub)), sub.to_dict()))
+        logger.info("Queued: %s to be translated to in: %s", sub.base_subtitle.path, sub.to_language, extra=task_fields(sub))
+
+    # Only their keys stay in memory, refill_queue() queues them as the queue drains
+    overflow = subtitles[room:]
+    known = task_queue.check_many([key_fn(sub) for sub in overflow])
+    spilled = [(str(key_fn(sub)), sub.to_dict()) for sub, in_queue in zip(overflow, known) if not in_queue]
+    if len(spilled) > 0:
+        logger.info("Translation queue full, spilled %d subtitles to the journal", len(spilled))
+        task_journal.spill(spilled)
+
+    if len(queued) + len(spilled) > 0:
+        scan_items.inc(len(queued) + len(spilled), type=video_type(subtitles[0].is_serie), result="queued")
+    task_journal.queued(queued)
+    task_journal.flush()
+    return len(queued) + len(spilled)
+
+def refill_queue():
+    """
+    Queue spilled subtitles again once the queue is down to half of QUEUE_CAPACITY
+    """
 
-def translation_worker(worker_id, base_url, api_key):
-    endpoint = f"{base_url}/api/subtitles"
-    headers = {"X-API-KEY": api_key}
-    with httpx.Client(timeout=translation_request_timeout) as client:
+    if len(task_journal.spilled) == 0 or len(task_queue) > queue_capacity // 2:
+        return
+
+    subs = []
+    for payload in task_journal.unspill(queue_room()):
+        sub = SubtitleTranslate.from_dict(payload)
+        # Its instance was removed from BAZARR_INSTANCES
+        if sub.instance in instances_by_name:
+            subs.append(sub)
+    refilled = len(task_queue.put_many(subs))
+    logger.debug("Refilled translation queue with %d spilled subtitles, %d still spilled", refilled, len(task_journal.spilled))
+
+async def translate_subtitle(client: httpx.AsyncClient, worker_id: int, sub: SubtitleTranslate) -> Exception | None:
+    """
+    Ask Bazarr to translate a subtitle, waits until the translation is done
+
+    Returns the error if the translation failed
+
+    Args:
+        client (httpx.AsyncClient): Bazarr client used for translations, see create_bazarr_client
+        worker_id (int): Worker slot the translation runs in, used for logging
+        sub (SubtitleTranslate): Subtitle to translate
+    """
+
+    fields = task_fields(sub, worker_id)
+    logger.info("[Worker: %d] Translating: %s to: %s", worker_id, sub.base_subtitle.path, sub.to_language, extra=fields)
+    params = {
+        "action": "translate",
+        "language": sub.to_language,
+        "path": sub.base_subtitle.path,
+        "type": "episode" if sub.is_serie else "movie",
+        "id": sub.video_id,
+        # Saved as the missing subtitle, even when translated from a source with other flags
+        "forced": sub.forced,
+        "hi": sub.hi,
+        "original_format": True,
+    }
+
+    started = time.monotonic()
+    try:
+        response = await client.patch("/api/subtitles", params=params)
+        response.raise_for_status()
+        duration = time.monotonic() - started
+        translation_duration.observe(duration, language=sub.to_language, type=video_type(sub.is_serie), result="success")
+        logger.info("[Worker: %d] Translation finished in %.1f seconds", worker_id, duration, extra={**fields, "duration": duration})
+        return None
+    except Exception as e:
+        duration = time.monotonic() - started
+        translation_duration.observe(duration, language=sub.to_language, type=video_type(sub.is_serie), result="error")
+        request_errors.inc(endpoint="/api/subtitles", status=error_label(e))
+        logger.error("[Worker: %d] Error while translating: %s", worker_id, e, extra={**fields, "duration": duration})
+        return e
+
+def handle_failed_translation(key: str, sub: SubtitleTranslate, error: Exception) -> bool:
+    """
+    Schedule another attempt for a failed translation or move it to the dead letter store
+
+    Returns whether the translation was scheduled again, its key then stays in the queue
+
+    Args:
+        key (str): Key of the subtitle in the translation queue
+        sub (SubtitleTranslate): Subtitle that failed to translate
+        error (Exception): Error the translation failed with
+    """
+
+    transient, retry_after = classify_error(error)
+    sub.attempts += 1
+    if transient and retry_policy.should_retry(sub.attempts):
+        delay = retry_policy.delay(sub.attempts, retry_after)
+        task_journal.queued([(key, sub.to_dict())])
+        task_journal.flush()
+        asyncio.get_running_loop().call_later(delay, task_queue.requeue, sub)
+        logger.info(
+            "Retrying translation of %s to: %s in %d seconds (attempt %d)",
+            sub.base_subtitle.path, sub.to_language, delay, sub.attempts + 1, extra=task_fields(sub),
+        )
+        return True
+
+    # Failed tasks are skipped by the scanner until DEAD_LETTER_TTL passes
+    task_journal.set_state(key, FAILED)
+    forget_fingerprint(instances_by_name[sub.instance], sub.is_serie, sub.video_id)
+    logger.error(
+        "Giving up translation of %s to: %s after %d attempts",
+        sub.base_subtitle.path, sub.to_language, sub.attempts, extra=task_fields(sub),
+    )
+    return False
+
+def claim_translation(key: str, sub: SubtitleTranslate) -> bool:
+    """
+    Claim a subtitle for this replica before translating it
+
+    A subtitle claimed by another replica is skipped, its video is looked at again by the
+    next scans and the subtitle queued again once TRANSLATION_REQUEST_TIMEOUT passes, in
+    case that replica didn't get to translate it
+
+    Args:
+        key (str): Key of the subtitle in the translation queue
+        sub (SubtitleTranslate): Subtitle about to be translated
+    """
+
+    try:
+        claimed = coordinator.claim(key)
+    except sqlite3.Error as e:
+        # Never translate without a claim, that could translate the subtitle twice
+        logger.warning("Couldn't claim %s to: %s: %s", sub.base_subtitle.path, sub.to_language, e, extra=task_fields(sub))
+        claimed = False
+
+    claims.inc(result="claimed" if claimed else "taken")
+    if not claimed:
+        task_journal.set_state(key, IN_FLIGHT)
+        # Otherwise its video is skipped as unchanged until the next full scan
+        forget_fingerprint(instances_by_name[sub.instance], sub.is_serie, sub.video_id)
+        logger.debug("Skipping %s to: %s, claimed by another replica", sub.base_subtitle.path, sub.to_language, extra=task_fields(sub))
+    return claimed
+
+async def coordination_heartbeat():
+    """
+    Keep the claims of the translations of this replica alive, every third of LEASE_TTL
+    """
+
+    while True:
+        await asyncio.sleep(lease_ttl / 3)
+        try:
+            coordinator.heartbeat()
+        except sqlite3.Error as e:
+            logger.warning("Couldn't renew claims: %s", e)
+
+async def wait_for_translation_allowance(sub: SubtitleTranslate) -> bool:
+    """
+    Wait until the circuit breaker, the spend budget and the rate limit all allow a translation
+
+    Returns whether the translation is the trial of the circuit breaker
+
+    Args:
+        sub (SubtitleTranslate): Subtitle about to be translated
+    """
+
+    trial = await circuit_breaker.acquire()
+    try:
+        file_size = sub.base_subtitle.file_size
+        wait = spend_budget.seconds_until_allowed(file_size)
+        while wait > 0:
+            logger.info("Translation budget reached, pausing translations for %d seconds", wait)
+            await asyncio.sleep(wait)
+            wait = spend_budget.seconds_until_allowed(file_size)
+
+        await token_bucket.acquire()
+    except asyncio.CancelledError:
+        if trial:
+            circuit_breaker.release_trial()
+        raise
+
+    spend_budget.record(file_size)
+    return trial
+
+def is_overloaded(error: Exception | None, latency: float) -> bool | None:
+    """
+    Tell if a translation shows the translation backend is overloaded, for the worker limiter
+
+    Timeouts, 429 and 5xx do, and so does a success slower than WORKERS_LATENCY_TARGET,
+    other errors tell nothing about the load
+
+    Args:
+        error (Exception | None): Error the translation failed with, if it did
+        latency (float): Seconds the translation took
+    """
+
+    if error is None:
+        return workers_latency_target > 0 and latency > workers_latency_target
+
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        return True if status == 429 or status >= 500 else None
+    return True if isinstance(error, httpx.TimeoutException) else None
+
+async def translation_dispatcher():
+    """
+    Take subtitles from the queue and translate up to NUM_WORKERS of them at the same time,
+    with ADAPTIVE_WORKERS the limit moves between MIN_WORKERS and NUM_WORKERS
+
+    Each subtitle is translated by the Bazarr instance it comes from, with its translation client
+
+    Cancelling the dispatcher cancels every translation still in flight
+    """
+
+    # Each worker slot is a token, waiting for a free slot bounds the in-flight translations,
+    # the limiter then decides how many of the slots can be used
+    worker_slots: asyncio.Queue[int] = asyncio.Queue()
+    for worker_id in range(num_workers):
+        worker_slots.put_nowait(worker_id)
+        translations_in_flight.set(0, worker=worker_id)
+
+    async def run(worker_id: int, sub: SubtitleTranslate, trial: bool):
+        key = str(key_fn(sub))
+        task_journal.set_state(key, IN_FLIGHT)
+        translations_in_flight.set(1, worker=worker_id)
+        requeued = False
+        # Other replicas leave the subtitle alone as long as this one would skip it
+        hold = 0
+        started = time.monotonic()
+        overloaded = None
+        recorded = False
+        try:
+            error = await translate_subtitle(instances_by_name[sub.instance].translation_client, worker_id, sub)
+            overloaded = is_overloaded(error, time.monotonic() - started)
+            if error is None:
+                task_journal.set_state(key, SUCCEEDED)
+                hold = journal_retention
+            else:
+                requeued = handle_failed_translation(key, sub, error)
+                hold = dead_letter_ttl
+
+            # Only errors that could come from the translation backend being down count towards the breaker
+            if error is None or classify_error(error)[0]:
+                was_open = circuit_breaker.is_open
+                circuit_breaker.record(error is None)
+                recorded = True
+                if circuit_breaker.is_open and not was_open:
+                    logger.error("Too many failed translations in a row, pausing translations for %d seconds", circuit_breaker_cooldown)
+        finally:
+            # A trial ending with a permanent error or cancelled says nothing about the backend, the next one decides
+            if trial and not recorded:
+                circuit_breaker.release_trial()
+            task_queue.finished(sub)
+            # A retried subtitle keeps its claim until its next attempt
+            if not requeued:
+                task_queue.done(sub)
+                release_claim(key, hold)
+            translations_in_flight.set(0, worker=worker_id)
+            release_worker(started, overloaded)
+            worker_slots.put_nowait(worker_id)
+
+    def release_claim(key: str, hold: float):
+        try:
+            coordinator.release(key, hold)
+        except sqlite3.Error as e:
+            # The claim expires after LEASE_TTL anyway
+            logger.warning("Couldn't release claim of %s: %s", key, e)
+
+    def release_worker(started: float, overloaded: bool | None):
+        previous = worker_limiter.current
+        worker_limiter.release(started, overloaded)
+        if worker_limiter.current < previous:
+            logger.info("Translation backend overloaded, lowering workers to %d", worker_limiter.current)
+        elif worker_limiter.current > previous:
+            logger.debug("Raising workers to %d", worker_limiter.current)
+
+    in_flight: set[asyncio.Task] = set()
+    try:
         while True:
-            sub: SubtitleTranslate | None = None
+            worker_id = await worker_slots.get()
             try:
-                sub = task_queue.get()
-                if sub is None:
+                await worker_limiter.acquire()
+            except asyncio.CancelledError:
+                worker_slots.put_nowait(worker_id)
+                raise
+
+            try:
+                sub = await task_queue.get()
+                refill_queue()
+                if not claim_translation(str(key_fn(sub)), sub):
+                    task_queue.finished(sub)
+                    task_queue.done(sub)
+                    worker_limiter.release(time.monotonic(), None)
+                    worker_slots.put_nowait(worker_id)
                     continue
-                logger.info(f"[Worker: {worker_id}] Translating: {sub.base_subtitle.path} to: {sub.to_language}")
-
-                params = {
-                    "action": "translate",
-                    "language": sub.to_language,
-                    "path": sub.base_subtitle.path,
-                    "type": "episode" if sub.is_serie else "movie",
-                    "id": sub.video_id,
-                    "forced": sub.base_subtitle.forced,
-                    "hi": sub.base_subtitle.hi,
-                    "original_format": True,
-                }
-
-                response = client.patch(endpoint, headers=headers, params=params)
-                response.raise_for_status()
-
-                logger.info(f"[Worker: {worker_id}] Translation finished")
-            except queue.Empty:
+                trial = await wait_for_translation_allowance(sub)
+            except asyncio.CancelledError:
+                worker_limiter.release(time.monotonic(), None)
+                worker_slots.put_nowait(worker_id)
+                raise
+
+            task = asyncio.create_task(run(worker_id, sub, trial))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+    finally:
+        for task in in_flight:
+            task.cancel()
+        await asyncio.gather(*in_flight, return_exceptions=True)
+
+async def scan_and_process(instance: Instance, is_serie: bool) -> int:
+    """
+    Scan the wanted list of episodes or movies and queue the subtitles that can be translated
+
+    Returns the number of subtitles queued
+
+    Pages go through a pipeline, the next pages are fetched while SCAN_WORKERS pages get their
+    metadata fetched and matched, at most SCAN_BUFFER_PAGES fetched pages wait to be processed
+
+    Args:
+        instance (Instance): Instance to scan
+        is_serie (bool): Whether to scan episodes or movies
+    """
+
+    name = "episodes" if is_serie else "movies"
+    logger.info("%sScanning for %s", instance.tag, name)
+    total = 0
+    unchanged = 0
+    queued = 0
+    seen: set[tuple[bool, int]] = set()
+    started = time.monotonic()
+    workers = max(scan_workers, 1)
+    pages: asyncio.Queue[List[Serie] | List[Movie] | None] = asyncio.Queue(maxsize=max(scan_buffer_pages, 1))
+
+    async def fetch_pages():
+        async for videos in iter_wanted_pages(instance.client, get_wanted_episodes if is_serie else get_wanted_movies):
+            await pages.put(videos)
+        for _ in range(workers):
+            await pages.put(None)
+
+    async def process_pages():
+        nonlocal total, unchanged, queued
+        while (videos := await pages.get()) is not None:
+            total += len(videos)
+            logger.info("%sFound %d missing subtitles for %s in page", instance.tag, len(videos), name)
+            changed = filter_changed_videos(instance, videos, seen)
+            unchanged += len(videos) - len(changed)
+            scan_items.inc(len(videos), type=video_type(is_serie), result="discovered")
+            scan_items.inc(len(videos) - len(changed), type=video_type(is_serie), result="unchanged")
+            if len(changed) == 0:
                 continue
-            except Exception as e:
-                logger.error(f"[Worker: {worker_id}] Error while translating: {e}")
-            
-            task_queue.done(sub)
-
-async def scan_and_process_series(base_url, api_key):
-    logger.info("Scanning for episodes")
-    series = await get_wanted_episodes(base_url, api_key)
-    if series is None or len(series) == 0:
-        logger.info("Found no missing subtitles for episodes")
-        return
-    
-    logger.info(f"Found {len(series)} missing subtitles for episodes")
-    subtitles_to_translate = await find_base_language_subtitles_from_missing_sutitles(base_url, api_key, series)
-    if subtitles_to_translate is None:
-        return
-    
-    queue_subtitles_for_translation(subtitles_to_translate)
-
-async def scan_and_process_movies(base_url, api_key):
-    logger.info("Scanning for movies")
-    movies = await get_wanted_movies(base_url, api_key)
-    if movies is None or len(movies) == 0:
-        logger.info("Found no missing subtitles for movies")
-        return
-    
-    logger.info(f"Found {len(movies)} missing subtitles for movies")
-    subtitles_to_translate = await find_base_language_subtitles_from_missing_sutitles(base_url, api_key, movies)
-    if subtitles_to_translate is None:
-        return
-    
-    queue_subtitles_for_translation(subtitles_to_translate)
 
-async def main(base_url, api_key):
-    for i in range(num_workers):
-        threading.Thread(target=translation_worker, args=(i, base_url, api_key), daemon=True).start()
-    
+            subtitles_to_translate = await find_base_language_subtitles_from_missing_sutitles(instance, changed)
+            if subtitles_to_translate is None:
+                continue
+
+            queued += queue_subtitles_for_translation(subtitles_to_translate)
+
+    # A failing stage cancels the others
+    async with asyncio.TaskGroup() as group:
+        group.create_task(fetch_pages())
+        for _ in range(workers):
+            group.create_task(process_pages())
+
+    prune_fingerprints(instance, is_serie, seen)
+    scan_duration.observe(time.monotonic() - started, type=video_type(is_serie))
+    scans_total.inc(type=video_type(is_serie))
+    if total == 0:
+        logger.info("%sFound no missing subtitles for %s", instance.tag, name)
+    else:
+        logger.info("%sFound %d missing subtitles for %s, %d unchanged since last scan", instance.tag, total, name, unchanged)
+    return queued
+
+async def scan_once(instance: Instance, is_serie: bool) -> int:
+    """
+    Scan a wanted list like scan_loop does, then purge the journal and save the negative cache
+
+    Returns the number of subtitles queued, 0 if the scan failed
+
+    Args:
+        instance (Instance): Instance to scan
+        is_serie (bool): Whether to scan episodes or movies
+    """
+
+    try:
+        queued = await scan_and_process(instance, is_serie)
+        task_journal.purge(journal_ttls)
+        negative_cache.save()
+        return queued
+    except Exception as e:
+        logger.error("Uncaugth exception: %s", e)
+        return 0
+
+async def scan_loop(instance: Instance, is_serie: bool):
+    """
+    Scan a wanted list of an instance until shutdown, as often as its ScanSchedule says
+
+    Scans that queue something keep the interval at SERIES_INTERVAL_BETWEEN_SCANS or
+    MOVIES_INTERVAL_BETWEEN_SCANS, scans that don't double it up to SCAN_BACKOFF_LIMIT times
+
+    Args:
+        instance (Instance): Instance to scan
+        is_serie (bool): Whether to scan episodes or movies
+    """
+
+    interval = series_interval_between_scans if is_serie else movies_interval_between_scans
+    schedule = ScanSchedule(interval, interval * scan_backoff_limit, jitter=scan_jitter)
+    name = "episodes" if is_serie else "movies"
+    scan_count = 0
     while not shutdown_event.is_set():
+        # Every few scans look at every wanted video again, in case something changed that
+        # isn't part of the wanted entry (like a subtitle in a base language being added)
+        if full_scan_every > 0 and scan_count % full_scan_every == 0:
+            clear_fingerprints(instance, is_serie)
+        scan_count += 1
+
+        started = time.monotonic()
+        queued = await scan_once(instance, is_serie)
+
+        delay = schedule.next_delay(queued > 0)
+        next_scan, skipped = next_scan_time(started, delay, time.monotonic())
+        if skipped > 0:
+            logger.info("%sScan of %s took longer than %d seconds, skipping %d scans", instance.tag, name, delay, skipped)
+        logger.debug("%sNext scan of %s in %.1f seconds", instance.tag, name, next_scan - time.monotonic())
+
         try:
-            if series_scan:
-                await scan_and_process_series(base_url, api_key)
-            if movies_scan:
-                await scan_and_process_movies(base_url, api_key)
-        except Exception as e:
-            logger.error(f"Uncaugth exception: {e}")
-        
-        await asyncio.sleep(interval_between_scans)
-
-def handle_shutdown():
+            await asyncio.wait_for(shutdown_event.wait(), timeout=max(next_scan - time.monotonic(), 0))
+        except asyncio.TimeoutError:
+            pass
+
+async def scan_and_process_videos(instance: Instance, episode_ids: set[int], movie_ids: set[int]):
+    """
+    Scan only the given videos, used for webhooks instead of going through the whole wanted lists
+
+    Args:
+        instance (Instance): Instance the videos are from
+        episode_ids (set[int]): Episode ids (sonarrEpisodeId) to scan
+        movie_ids (set[int]): Movie ids (radarrId) to scan
+    """
+
+    for is_serie, video_ids in ((True, episode_ids), (False, movie_ids)):
+        if len(video_ids) == 0 or not (instance.series_scan if is_serie else instance.movies_scan):
+            continue
+
+        logger.info("%sScanning %d %s from webhook", instance.tag, len(video_ids), "episodes" if is_serie else "movies")
+        # The metadata of a video has its missing subtitles too, no need for the wanted list
+        metadata = await get_videos_metadata(instance.client, is_serie, sorted(video_ids))
+        videos = [video for video in metadata.values() if len(video.missing_subtitles) > 0]
+        if len(videos) == 0:
+            logger.info("%sFound no missing subtitles for videos from webhook", instance.tag)
+            continue
+
+        subtitles_to_translate = await find_base_language_subtitles_from_missing_sutitles(instance, videos, metadata)
+        if subtitles_to_translate is None:
+            continue
+
+        queue_subtitles_for_translation(subtitles_to_translate)
+
+def create_bazarr_client(
+    base_url: str,
+    api_key: str,
+    timeout: float = 5.0,
+    max_connections: int = http_max_connections,
+) -> httpx.AsyncClient:
+    """
+    Create a long-lived client for Bazarr API calls
+
+    Args:
+        base_url (str): Base URL of Bazarr API
+        api_key (str): API key for authentication
+        timeout (float): Request timeout in seconds (default: 5)
+        max_connections (int): Connection pool size (default: HTTP_MAX_CONNECTIONS)
+    """
+
+    limits = httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=min(http_max_keepalive_connections, max_connections),
+        keepalive_expiry=http_keepalive_expiry,
+    )
+    return httpx.AsyncClient(
+        base_url=base_url, headers={"X-API-KEY": api_key}, limits=limits, http2=http2, timeout=timeout
+    )
+
+def resume_from_journal():
+    task_journal.open()
+    task_journal.purge(journal_ttls)
+    try:
+        negative_cache.load()
+    except (OSError, ValueError) as e:
+        # Only a cache, every video is looked at again
+        logger.warning("Couldn't load negative cache: %s", e)
+
+    subs = []
+    dropped = 0
+    for payload in task_journal.resume():
+        sub = SubtitleTranslate.from_dict(payload)
+        # Its instance was removed from BAZARR_INSTANCES
+        if sub.instance not in instances_by_name:
+            dropped += 1
+            continue
+
+        subs.append(sub)
+
+    resumed = len(task_queue.put_many(subs[:queue_room()]))
+    if len(subs) > resumed:
+        task_journal.spill([(str(key_fn(sub)), sub.to_dict()) for sub in subs[resumed:]])
+    refill_queue()
+    if resumed > 0:
+        logger.info("Resumed %d queued subtitles from journal", resumed)
+    if dropped > 0:
+        logger.info("Dropped %d queued subtitles of instances no longer configured", dropped)
+
+async def open_instance_clients(stack: AsyncExitStack):
+    """
+    Create the clients of every instance, closed with the stack
+
+    Args:
+        stack (AsyncExitStack): Stack the clients are entered in
+    """
+
+    for instance in instances:
+        instance.client = await stack.enter_async_context(create_bazarr_client(instance.base_url, instance.api_key))
+        # Translations get their own pool so long running requests never starve the scans
+        instance.translation_client = await stack.enter_async_context(create_bazarr_client(
+            instance.base_url,
+            instance.api_key,
+            timeout=translation_request_timeout,
+            max_connections=min(instance.num_workers, num_workers),
+        ))
+
+def create_coalescer(instance: Instance) -> WebhookCoalescer:
+    return WebhookCoalescer(
+        webhook_coalesce_window, lambda episode_ids, movie_ids: scan_and_process_videos(instance, episode_ids, movie_ids)
+    )
+
+async def main():
+    resume_from_journal()
+
+    async with AsyncExitStack() as stack:
+        await open_instance_clients(stack)
+        coordinator.open()
+        stack.callback(coordinator.close)
+        heartbeat = asyncio.create_task(coordination_heartbeat())
+        dispatcher = asyncio.create_task(translation_dispatcher())
+
+        webhook_server = None
+        metrics_server = None
+        coalescers = {instance.name: create_coalescer(instance) for instance in instances}
+        if webhook_port > 0:
+            webhook_server = HttpServer(webhook_host, webhook_port)
+            # Named instances each get their own path
+            for name, coalescer in coalescers.items():
+                add_webhook_route(webhook_server, coalescer, webhook_token, f"/webhook/{name}" if name else "/webhook")
+            # Both on the same port, only one server can listen on it
+            if metrics_port == webhook_port:
+                add_metrics_route(webhook_server)
+            await webhook_server.start()
+            logger.info("Listening for webhooks on %s:%d", webhook_host, webhook_port)
+        if metrics_port > 0 and metrics_port != webhook_port:
+            metrics_server = HttpServer(metrics_host, metrics_port)
+            add_metrics_route(metrics_server)
+            await metrics_server.start()
+            logger.info("Serving metrics on %s:%d", metrics_host, metrics_port)
+
+        # Each wanted list has its own schedule
+        scans = []
+        for instance in instances:
+            if instance.series_scan:
+                scans.append(asyncio.create_task(scan_loop(instance, True)))
+            if instance.movies_scan:
+                scans.append(asyncio.create_task(scan_loop(instance, False)))
+
+        try:
+            await asyncio.gather(*scans)
+        finally:
+            for scan in scans:
+                scan.cancel()
+            await asyncio.gather(*scans, return_exceptions=True)
+            if webhook_server is not None:
+                await webhook_server.close()
+            if metrics_server is not None:
+                await metrics_server.close()
+            for coalescer in coalescers.values():
+                await coalescer.close()
+            dispatcher.cancel()
+            heartbeat.cancel()
+            await asyncio.gather(dispatcher, heartbeat, return_exceptions=True)
+            task_journal.close()
+            negative_cache.save()
+
+def handle_shutdown(main_task: asyncio.Task):
     logger.info("Received exit signal")
-    sys.exit(1)
+    shutdown_event.set()
+    main_task.cancel()
 
 
 
 if __name__ == "__main__":
-    # Do verification on arguments
-    base_url = os.getenv("BAZARR_BASE_URL")
-    api_key = os.getenv("BAZARR_API_KEY")
+    # Do verification on arguments, for each instance, named instances read <NAME>_<VARIABLE> first
+    for instance in instances:
+        prefix = instance.env_prefix
+        if instance.base_url is None:
+            print(f"{prefix}BAZARR_BASE_URL is missing")
+            sys.exit(1)
 
-    if base_url is None:
-        print("BAZARR_BASE_URL is missing")
-        sys.exit(1)
+        if instance.api_key is None:
+            print(f"{prefix}BAZARR_API_KEY is missing")
+            sys.exit(1)
 
-    if api_key is None:
-        print("BAZARR_API_KEY is missing")
-        sys.exit(1)
+        if len(instance.base_languages) == 0:
+            print(f"Missing {prefix}BASE_LANGUAGES")
+            sys.exit(1)
+
+        wrong_languages = [lang for lang in instance.base_languages if len(lang) > 2 or len(lang) < 2]
+        if len(wrong_languages) > 0:
+            print(f"Wrong languages given in {prefix}BASE_LANGUAGES, wrong ones: {wrong_languages}, expected to be 2 characters long (code2)")
+            sys.exit(1)
+
+        if len(instance.to_languages) == 0:
+            print(f"Missing {prefix}TO_LANGUAGES")
+            sys.exit(1)
 
-    if len(base_languages) == 0:
-        print("Missing BASE_LANGUAGES")
+        wrong_languages = [lang for lang in instance.to_languages if len(lang) > 2 or len(lang) < 2]
+        if len(wrong_languages) > 0:
+            print(f"Wrong languages given in {prefix}TO_LANGUAGES, wrong ones: {wrong_languages}, expected to be 2 characters long (code2)")
+            sys.exit(1)
+
+        if not instance.series_scan and not instance.movies_scan:
+            print(f"Both series and movies scan are disabled{f' for instance {instance.name}' if instance.name else ''}, nothing will be done")
+            sys.exit(1)
+
+        wrong_rules = [rule for rule in instance.source_rules if rule not in SOURCE_RULES]
+        if len(wrong_rules) > 0:
+            print(f"Wrong rules given in {prefix}SOURCE_RULES, wrong ones: {wrong_rules}, expected to be in {list(SOURCE_RULES)}")
+            sys.exit(1)
+
+    if len({instance.env_prefix for instance in instances}) < len(instances):
+        print(f"Instances in BAZARR_INSTANCES must have different names, got: {instance_names}")
         sys.exit(1)
-    
-    wrong_languages = [lang for lang in base_languages if len(lang) > 2 or len(lang) < 2]
-    if len(wrong_languages) > 0:
-        print(f"Wrong languages given in BASE_LANGUAGES, wrong ones: {wrong_languages}, expected to be 2 characters long (code2)")
+
+    wrong_rules = [rule for rule in priority_rules if rule not in PRIORITY_RULES]
+    if len(wrong_rules) > 0:
+        print(f"Wrong rules given in PRIORITY_RULES, wrong ones: {wrong_rules}, expected to be in {list(PRIORITY_RULES)}")
         sys.exit(1)
 
-    if len(to_languges) == 0:
-        print("Missing TO_LANGUAGES")
+    wrong_rules = [rule for rule in lanes if rule not in LANE_RULES]
+    if len(wrong_rules) > 0:
+        print(f"Wrong rules given in LANES, wrong ones: {wrong_rules}, expected to be in {list(LANE_RULES)}")
         sys.exit(1)
 
-    wrong_languages = [lang for lang in to_languges if len(lang) > 2 or len(lang) < 2]
-    if len(wrong_languages) > 0:
-        print(f"Wrong languages given in TO_LANGUAGES, wrong ones: {wrong_languages}, expected to be 2 characters long (code2)")
+    for name, interval in (
+        ("INTERVAL_BETWEEN_SCANS", interval_between_scans),
+        ("SERIES_INTERVAL_BETWEEN_SCANS", series_interval_between_scans),
+        ("MOVIES_INTERVAL_BETWEEN_SCANS", movies_interval_between_scans),
+    ):
+        if interval < 0:
+            print(f"Wrong {name}: {interval}, expected 0 or more seconds")
+            sys.exit(1)
+
+    if not 0 <= scan_jitter < 1:
+        print(f"Wrong SCAN_JITTER: {scan_jitter}, expected to be at least 0 and less than 1")
         sys.exit(1)
 
-    if not series_scan and not movies_scan:
-        print("Both series and movies scan are disabled, nothing will be done")
-        sys.exit(1) 
+    if log_format not in ("text", "json"):
+        print(f"Wrong LOG_FORMAT: {log_format}, expected text or json")
+        sys.exit(1)
 
     # Setup logger
     logger.propagate = False
     trailing_slash = "/" if not log_directory.endswith("/") else ""
     os.makedirs(log_directory, exist_ok=True)
-    handler = TimedRotatingFileHandler(
-        f"{log_directory}{trailing_slash}bazarr_lingarr_autotranslate.log", when="midnight", interval=1, backupCount=4
-    )
-    formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
-    handler.setFormatter(formatter)
-    logger.addHandler(handler)
+    log_listener = setup_logging(logger, f"{log_directory}{trailing_slash}bazarr_lingarr_autotranslate.log", log_format)
 
     match log_level.lower():
         case "info":
@@ -398,23 +1379,88 @@ if __name__ == "__main__":
         case "debug":
             logger.setLevel(logging.DEBUG)
             logger.debug("Configuration: --------------------")
-            logger.debug(f"bazarr_base_url: {base_url}")
-            logger.debug(f"base_languages: {base_languages}")
-            logger.debug(f"to_languages: {to_languges}")
+            for instance in instances:
+                logger.debug(f"instance: {instance.name or 'default'}")
+                logger.debug(f"  bazarr_base_url: {instance.base_url}")
+                logger.debug(f"  base_languages: {instance.base_languages}")
+                logger.debug(f"  to_languages: {instance.to_languages}")
+                logger.debug(f"  series_scan: {instance.series_scan}")
+                logger.debug(f"  movies_scan: {instance.movies_scan}")
+                logger.debug(f"  num_workers: {instance.num_workers}")
+                logger.debug(f"  source_rules: {instance.source_rules}")
+                logger.debug(f"  min_source_size: {instance.min_source_size}")
             logger.debug(f"translation_request_timeout: {translation_request_timeout}")
             logger.debug(f"num_workers: {num_workers}")
+            logger.debug(f"adaptive_workers: {adaptive_workers}")
+            logger.debug(f"min_workers: {min_workers}")
+            logger.debug(f"workers_latency_target: {workers_latency_target}")
             logger.debug(f"interval_between_scans: {interval_between_scans}")
+            logger.debug(f"series_interval_between_scans: {series_interval_between_scans}")
+            logger.debug(f"movies_interval_between_scans: {movies_interval_between_scans}")
+            logger.debug(f"scan_backoff_limit: {scan_backoff_limit}")
+            logger.debug(f"scan_jitter: {scan_jitter}")
             logger.debug(f"log_level: {log_level}")
             logger.debug(f"log_directory: {log_directory}")
-            logger.debug(f"series_scan: {series_scan}")
-            logger.debug(f"movies_scan: {movies_scan}")
+            logger.debug(f"log_format: {log_format}")
+            logger.debug(f"log_payload_limit: {log_payload_limit}")
+            logger.debug(f"http_max_connections: {http_max_connections}")
+            logger.debug(f"http_max_keepalive_connections: {http_max_keepalive_connections}")
+            logger.debug(f"http_keepalive_expiry: {http_keepalive_expiry}")
+            logger.debug(f"http2: {http2}")
+            logger.debug(f"wanted_page_size: {wanted_page_size}")
+            logger.debug(f"metadata_chunk_size: {metadata_chunk_size}")
+            logger.debug(f"metadata_concurrency: {metadata_concurrency}")
+            logger.debug(f"scan_workers: {scan_workers}")
+            logger.debug(f"scan_buffer_pages: {scan_buffer_pages}")
+            logger.debug(f"data_directory: {data_directory}")
+            logger.debug(f"journal_batch_size: {journal_batch_size}")
+            logger.debug(f"journal_retention: {journal_retention}")
+            logger.debug(f"negative_cache_ttl: {negative_cache_ttl}")
+            logger.debug(f"negative_cache_size: {negative_cache_size}")
+            logger.debug(f"negative_cache_persist: {negative_cache_persist}")
+            logger.debug(f"full_scan_every: {full_scan_every}")
+            logger.debug(f"translations_per_minute: {translations_per_minute}")
+            logger.debug(f"daily_translation_limit: {daily_translation_limit}")
+            logger.debug(f"monthly_translation_limit: {monthly_translation_limit}")
+            logger.debug(f"daily_translation_bytes_limit: {daily_translation_bytes_limit}")
+            logger.debug(f"monthly_translation_bytes_limit: {monthly_translation_bytes_limit}")
+            logger.debug(f"circuit_breaker_threshold: {circuit_breaker_threshold}")
+            logger.debug(f"circuit_breaker_cooldown: {circuit_breaker_cooldown}")
+            logger.debug(f"priority_rules: {priority_rules}")
+            logger.debug(f"priority_max_wait: {priority_max_wait}")
+            logger.debug(f"queue_capacity: {queue_capacity}")
+            logger.debug(f"lanes: {lanes}")
+            logger.debug(f"lane_workers: {lane_workers}")
+            logger.debug(f"lane_limits: {lane_limits}")
+            logger.debug(f"lane_stealing: {lane_stealing}")
+            logger.debug(f"translation_max_attempts: {translation_max_attempts}")
+            logger.debug(f"retry_base_delay: {retry_base_delay}")
+            logger.debug(f"retry_max_delay: {retry_max_delay}")
+            logger.debug(f"dead_letter_ttl: {dead_letter_ttl}")
+            logger.debug(f"webhook_host: {webhook_host}")
+            logger.debug(f"webhook_port: {webhook_port}")
+            logger.debug(f"webhook_coalesce_window: {webhook_coalesce_window}")
+            logger.debug(f"metrics_host: {metrics_host}")
+            logger.debug(f"metrics_port: {metrics_port}")
+            logger.debug(f"coordination_path: {coordination_path}")
+            logger.debug(f"replica_id: {replica_id}")
+            logger.debug(f"lease_ttl: {lease_ttl}")
             logger.debug("End Configuration: ----------------")
         case "error":
             logger.setLevel(logging.ERROR)
 
     # Start running things
     loop = asyncio.new_event_loop()
+    main_task = loop.create_task(main())
     for sig in (signal.SIGINT, signal.SIGTERM):
-        loop.add_signal_handler(sig, handle_shutdown)
+        loop.add_signal_handler(sig, handle_shutdown, main_task)
+
+    try:
+        loop.run_until_complete(main_task)
+    except asyncio.CancelledError:
+        pass
+    finally:
+        loop.close()
+        log_listener.stop()
 
-    loop.run_until_complete(main(base_url, api_key))
\ No newline at end of file
+    sys.exit(1)
\ No newline at end of file
@@ -0,0 +1,80 @@
+import os
+import json
+import time
+from collections import OrderedDict
+from typing import Hashable
+
+class NegativeCache:
+    """
+    Videos that had nothing to translate, skipped until ttl passes or their fingerprint changes
+
+    Entries are evicted least recently used first past max_size, with a path they are
+    saved to a JSON file so they survive restarts, keys must then be tuples of JSON values
+
+    Args:
+        ttl (float): Seconds an entry stays valid, 0 or less disables the cache
+        max_size (int): Most entries kept
+        path (str, optional): JSON file the entries are saved to and loaded from
+    """
+
+    def __init__(self, ttl: float, max_size: int, path: str | None = None):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.path = path
+        # key: (fingerprint, expires_at), least recently used first
+        self.entries: OrderedDict[Hashable, tuple[int, float]] = OrderedDict()
+
+    def __len__(self):
+        return len(self.entries)
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_size > 0
+
+    def contains(self, key: Hashable, fingerprint: int) -> bool:
+        entry = self.entries.get(key)
+        if entry is None:
+            return False
+
+        if entry[0] != fingerprint or entry[1] < time.time():
+            del self.entries[key]
+            return False
+
+        self.entries.move_to_end(key)
+        return True
+
+    def add(self, key: Hashable, fingerprint: int):
+        if not self.enabled:
+            return
+
+        self.entries[key] = (fingerprint, time.time() + self.ttl)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def discard(self, key: Hashable):
+        self.entries.pop(key, None)
+
+    def load(self):
+        if self.path is None or not self.enabled or not os.path.exists(self.path):
+            return
+
+        now = time.time()
+        with open(self.path, "r", encoding="utf-8") as f:
+            for key, fingerprint, expires_at in json.load(f):
+                if expires_at >= now:
+                    self.entries[tuple(key)] = (fingerprint, expires_at)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def save(self):
+        if self.path is None or not self.enabled:
+            return
+
+        now = time.time()
+        entries = [[key, fingerprint, expires_at] for key, (fingerprint, expires_at) in self.entries.items() if expires_at >= now]
+        # Written next to the file then renamed, a crash never leaves half a file
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(entries, f)
+        os.replace(temp_path, self.path)
@@ -0,0 +1,205 @@
+import time
+import asyncio
+from datetime import datetime, timedelta
+import sqlite3
+from typing import List, Protocol, Tuple
+
+class TokenBucket:
+    """
+    Spread requests evenly, at most rate_per_minute of them per minute
+
+    Args:
+        rate_per_minute (float): Allowed requests per minute, 0 or less disables the limit
+        burst (int): Requests that can go through back to back after an idle period
+    """
+
+    def __init__(self, rate_per_minute: float, burst: int = 1):
+        self.rate = rate_per_minute / 60
+        self.capacity = max(burst, 1)
+        self.tokens = float(self.capacity)
+        self.updated_at = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        if self.rate <= 0:
+            return
+
+        # The lock makes waiters take tokens in arrival order
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+class UsageStore(Protocol):
+    def get_usage(self, period: str) -> Tuple[int, int]: ...
+
+    def add_usage(self, periods: list[str], count: int, size: int): ...
+
+class SqliteUsageStore:
+    """
+    UsageStore in a table of the SQLite database of the class it's mixed in
+
+    That class keeps its connection in self.conn and calls create_usage_table() when opening it,
+    the journal of a single replica and the database shared by replicas both keep usage this way
+    """
+
+    conn: sqlite3.Connection | None
+
+    def create_usage_table(self):
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS usage ("
+            "period TEXT PRIMARY KEY, count INTEGER NOT NULL, bytes INTEGER NOT NULL)"
+        )
+
+    def get_usage(self, period: str) -> Tuple[int, int]:
+        """
+        Get the number of translations requested and their size in bytes during a period
+
+        Args:
+            period (str): Period name, like day:2025-01-31
+        """
+
+        row = self.conn.execute("SELECT count, bytes FROM usage WHERE period = ?", (period,)).fetchone()
+        return (row[0], row[1]) if row is not None else (0, 0)
+
+    def add_usage(self, periods: List[str], count: int, size: int):
+        self.conn.executemany(
+            "INSERT INTO usage (period, count, bytes) VALUES (?, ?, ?) "
+            "ON CONFLICT (period) DO UPDATE SET count = count + excluded.count, bytes = bytes + excluded.bytes",
+            [(period, count, size) for period in periods],
+        )
+        self.conn.commit()
+
+class SpendBudget:
+    """
+    Daily and monthly caps on the number of translations and on the size of the translated subtitles
+
+    Usage is kept in the store so restarting doesn't reset the caps, a limit of 0 or less disables it
+    """
+
+    def __init__(
+        self,
+        store: UsageStore,
+        daily_count: int = 0,
+        monthly_count: int = 0,
+        daily_bytes: int = 0,
+        monthly_bytes: int = 0,
+    ):
+        self.store = store
+        self.limits = {"day": (daily_count, daily_bytes), "month": (monthly_count, monthly_bytes)}
+
+    @staticmethod
+    def periods(now: datetime) -> dict[str, str]:
+        return {"day": now.strftime("day:%Y-%m-%d"), "month": now.strftime("month:%Y-%m")}
+
+    @staticmethod
+    def next_period_start(kind: str, now: datetime) -> datetime:
+        if kind == "day":
+            return datetime(now.year, now.month, now.day) + timedelta(days=1)
+        return datetime(now.year + now.month // 12, now.month % 12 + 1, 1)
+
+    def seconds_until_allowed(self, size: int) -> float:
+        """
+        Get how long to wait before a translation of that size fits in the budget, 0 if it fits now
+
+        Args:
+            size (int): Size in bytes of the subtitle to translate
+        """
+
+        now = datetime.now()
+        wait = 0.0
+        for kind, period in self.periods(now).items():
+            max_count, max_bytes = self.limits[kind]
+            count, used_bytes = self.store.get_usage(period)
+            # A single subtitle bigger than the cap can never fit, let it through alone in an empty period
+            over_bytes = max_bytes > 0 and used_bytes > 0 and used_bytes + size > max_bytes
+            if (max_count > 0 and count >= max_count) or over_bytes:
+                wait = max(wait, (self.next_period_start(kind, now) - now).total_seconds())
+
+        return wait
+
+    def record(self, size: int):
+        self.store.add_usage(list(self.periods(datetime.now()).values()), 1, size)
+
+class CircuitBreaker:
+    """
+    Stop sending requests for a while after too many consecutive failures
+
+    Once the cooldown is over a single trial request goes through, the circuit closes
+    again if it succeeds and stays open for another cooldown if it fails, a trial ending
+    any other way is released and the next request becomes the trial
+
+    Args:
+        threshold (int): Consecutive failures that open the circuit, 0 or less disables it
+        cooldown (float): Seconds to wait before the trial request
+    """
+
+    def __init__(self, threshold: int, cooldown: float):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at: float | None = None
+        self.trial = False
+        self.changed = asyncio.Event()
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None
+
+    def notify(self):
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+    async def acquire(self) -> bool:
+        """
+        Wait until a request can be sent, returns whether it's the trial request
+
+        The trial must end with record() or release_trial(), until then no other request goes through
+        """
+
+        while self.opened_at is not None:
+            remaining = self.opened_at + self.cooldown - time.monotonic()
+            if remaining <= 0 and not self.trial:
+                self.trial = True
+                return True
+
+            changed = self.changed
+            try:
+                await asyncio.wait_for(changed.wait(), timeout=remaining if remaining > 0 else None)
+            except asyncio.TimeoutError:
+                pass
+
+        return False
+
+    def release_trial(self):
+        """
+        End a trial that tells nothing about the backend (a permanent error, cancelled), another one can go through
+        """
+
+        if self.trial:
+            self.trial = False
+            self.notify()
+
+    def record(self, success: bool):
+        if self.threshold <= 0:
+            return
+
+        if success:
+            self.failures = 0
+            if self.opened_at is not None:
+                self.opened_at = None
+                self.trial = False
+                self.notify()
+            return
+
+        self.failures += 1
+        if self.trial or (self.opened_at is None and self.failures >= self.threshold):
+            self.opened_at = time.monotonic()
+            self.trial = False
+            self.notify()
@@ -0,0 +1,70 @@
+import random
+import httpx
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter between attempts of a failed request
+
+    Args:
+        max_attempts (int): Attempts before giving up, including the first one
+        base_delay (float): Upper bound in seconds of the delay after the first failure
+        max_delay (float): Upper bound in seconds of any delay
+    """
+
+    def __init__(self, max_attempts: int, base_delay: float, max_delay: float):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def should_retry(self, attempts: int) -> bool:
+        return attempts < self.max_attempts
+
+    def delay(self, attempts: int, retry_after: float | None = None) -> float:
+        """
+        Get the delay in seconds before the next attempt
+
+        Args:
+            attempts (int): Attempts made so far
+            retry_after (float, optional): Delay asked by the server, used as a minimum
+        """
+
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempts - 1)))
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_delay))
+        return delay
+
+def parse_retry_after(value: str | None) -> float | None:
+    if value is None:
+        return None
+
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+
+    try:
+        return max((parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds(), 0)
+    except (TypeError, ValueError):
+        return None
+
+def classify_error(error: Exception) -> tuple[bool, float | None]:
+    """
+    Tell if a failed request is worth retrying
+
+    Returns whether the error is transient and the delay asked by the server if any,
+    timeouts, connection errors, 408, 429 and 5xx are transient, other 4xx are not
+
+    Args:
+        error (Exception): Error raised by the request
+    """
+
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        if status == 429 or status == 503:
+            return True, parse_retry_after(error.response.headers.get("Retry-After"))
+        return status == 408 or status >= 500, None
+
+    # Timeouts, connection errors and anything unexpected
+    return True, None
@@ -0,0 +1,55 @@
+import random
+
+class ScanSchedule:
+    """
+    Time between two scans of a wanted list, short while scans find work and growing when they don't
+
+    A scan that finds something brings the interval back to min_interval, one that finds
+    nothing multiplies it by backoff up to max_interval, every delay is then moved by up
+    to jitter of itself either way so scans of different lists and replicas spread out
+
+    Args:
+        min_interval (float): Seconds between scans that find work
+        max_interval (float): Longest seconds between scans
+        backoff (float): Factor applied to the interval after a scan finding nothing (default: 2)
+        jitter (float): Share of the interval added or removed at random (default: 0.1)
+    """
+
+    def __init__(self, min_interval: float, max_interval: float, backoff: float = 2, jitter: float = 0.1):
+        self.min_interval = min_interval
+        self.max_interval = max(max_interval, min_interval)
+        self.backoff = backoff
+        self.jitter = jitter
+        self.interval = min_interval
+
+    def next_delay(self, found_work: bool) -> float:
+        """
+        Seconds from the start of the last scan to the next one
+
+        Args:
+            found_work (bool): Whether the last scan queued something
+        """
+
+        if found_work:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.interval * self.backoff, self.max_interval)
+        return self.interval * (1 + random.uniform(-self.jitter, self.jitter))
+
+def next_scan_time(started: float, delay: float, now: float) -> tuple[float, int]:
+    """
+    Start of the next scan and the number of scans skipped, a scan running into the next
+    ones skips them rather than starting again right away
+
+    Args:
+        started (float): Start of the last scan
+        delay (float): Seconds between the start of the last scan and the next one, see ScanSchedule.next_delay
+        now (float): Current time, the same clock as started
+    """
+
+    # A delay of 0 scans again right away, there is nothing to skip
+    if delay <= 0:
+        return started, 0
+
+    skipped = int((now - started) // delay)
+    return started + (skipped + 1) * delay, skipped
@@ -0,0 +1,75 @@
+from typing import List
+from class_types import Subtitle, MissingSubtitle
+
+SOURCE_RULES = ("forced", "language", "hi", "size")
+
+class SourceSelector:
+    """
+    Picks the existing subtitle a missing one is translated from, ranked by rules in order
+
+    - forced: sources whose forced flag is the same as the missing subtitle's first
+    - language: sources in the base languages listed first first
+    - hi: sources whose hearing impaired flag is the same as the missing subtitle's first
+    - size: bigger sources first, they usually have the most lines
+
+    Args:
+        base_languages (List[str]): Languages subtitles can be translated from, preferred first
+        rules (List[str]): Rules of SOURCE_RULES, in order of importance
+        min_size (int): Sources smaller than that (in bytes) are never used, 0 to use any (default: 0)
+    """
+
+    def __init__(self, base_languages: List[str], rules: List[str], min_size: int = 0):
+        self.language_ranks = {lang: rank for rank, lang in reversed(list(enumerate(base_languages)))}
+        self.rules = rules
+        self.min_size = min_size
+
+    def index(self, subtitles: List[Subtitle]) -> dict[str, List[Subtitle]]:
+        """
+        Usable sources of a video by language, built once for all its missing subtitles
+
+        Args:
+            subtitles (List[Subtitle]): Existing subtitles of the video
+        """
+
+        index: dict[str, List[Subtitle]] = {}
+        for sub in subtitles:
+            if sub.code2 in self.language_ranks and sub.file_size >= self.min_size:
+                index.setdefault(sub.code2, []).append(sub)
+        return index
+
+    def rank(self, sub: Subtitle, missing: MissingSubtitle) -> tuple:
+        ranks = []
+        for rule in self.rules:
+            match rule:
+                case "forced":
+                    ranks.append(sub.forced != missing.forced)
+                case "language":
+                    ranks.append(self.language_ranks[sub.code2])
+                case "hi":
+                    ranks.append(sub.hi != missing.hi)
+                case "size":
+                    ranks.append(-sub.file_size)
+        return tuple(ranks)
+
+    def select(self, index: dict[str, List[Subtitle]], missing: MissingSubtitle) -> Subtitle | None:
+        """
+        Best source for a missing subtitle, None if the video has none
+
+        Args:
+            index (dict[str, List[Subtitle]]): Sources of the video, see index
+            missing (MissingSubtitle): Missing subtitle to translate
+        """
+
+        best = None
+        best_rank = None
+        for language, subs in index.items():
+            # A subtitle in the language to translate in is never used as source
+            # I don't think this should happen but better safe than sorry
+            if language == missing.code2:
+                continue
+
+            for sub in subs:
+                rank = self.rank(sub, missing)
+                if best_rank is None or rank < best_rank:
+                    best, best_rank = sub, rank
+        return best
@@ -0,0 +1,95 @@
+import json
+import queue
+import logging
+from typing import Any
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
+
+# Attributes every LogRecord has, anything else was given through extra=
+RECORD_ATTRIBUTES = set(logging.LogRecord("", 0, "", 0, "", (), None).__dict__) | {"message", "asctime", "taskName"}
+
+class Payload:
+    """
+    Log argument rendering a payload as JSON only if the record is emitted, and at most limit characters of it
+
+    Items of lists are rendered one by one until the limit is reached, so the cost doesn't
+    grow with the size of the payload, objects with a to_dict() method are rendered through it
+
+    Args:
+        obj (Any): Payload to log
+        limit (int): Maximum number of characters rendered (default: 2000)
+    """
+
+    __slots__ = ("obj", "limit")
+
+    def __init__(self, obj: Any, limit: int = 2000):
+        self.obj = obj
+        self.limit = limit
+
+    @staticmethod
+    def render(obj: Any) -> str:
+        if hasattr(obj, "to_dict"):
+            obj = obj.to_dict()
+        return json.dumps(obj, ensure_ascii=False, default=str)
+
+    def __str__(self) -> str:
+        if not isinstance(self.obj, (list, tuple)):
+            text = self.render(self.obj)
+            return text if len(text) <= self.limit else f"{text[:self.limit]}... ({len(text)} characters)"
+
+        parts = []
+        size = 0
+        for item in self.obj:
+            if size >= self.limit:
+                break
+            text = self.render(item)
+            parts.append(text)
+            size += len(text) + 2
+
+        text = "[" + ", ".join(parts)
+        if len(parts) < len(self.obj):
+            return f"{text[:self.limit]}, ... ({len(self.obj)} items)]"
+        return text[:self.limit] + ("]" if len(text) <= self.limit else f"... ({len(self.obj)} items)]")
+
+class JsonFormatter(logging.Formatter):
+    """
+    Format records as one JSON object per line, with the fields given through extra=
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "message": record.getMessage(),
+        }
+        for name, value in record.__dict__.items():
+            if name not in RECORD_ATTRIBUTES:
+                entry[name] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+def setup_logging(logger: logging.Logger, path: str, log_format: str = "text") -> QueueListener:
+    """
+    Send the records of logger to a daily rotated file, written from a background thread
+
+    Logging only builds the message of records that pass the level and puts them in a queue,
+    formatting and writing happen in the listener thread, the returned listener has to be
+    stopped before exiting to flush the queue
+
+    Args:
+        logger (logging.Logger): Logger to set up
+        path (str): Path of the log file
+        log_format (str): "text" or "json" for JSON lines (default: "text")
+    """
+
+    handler = TimedRotatingFileHandler(path, when="midnight", interval=1, backupCount=4)
+    if log_format == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
+
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(QueueHandler(log_queue))
+    listener = QueueListener(log_queue, handler, respect_handler_level=True)
+    listener.start()
+    return listener
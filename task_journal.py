@@ -0,0 +1,189 @@
+import os
+import json
+import time
+import sqlite3
+from typing import Any, Iterable, List, Tuple
+from rate_limiter import SqliteUsageStore
+
+QUEUED = "queued"
+IN_FLIGHT = "in_flight"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+# Queued but only on disk, the translation queue was full
+SPILLED = "spilled"
+# States the scanner checks before queueing a task again
+SKIPPED_STATES = (IN_FLIGHT, SUCCEEDED, FAILED)
+
+class TaskJournal(SqliteUsageStore):
+    """
+    On-disk record of translation tasks, keyed like the translation queue
+
+    Queued tasks are written in batches since a scan can queue thousands of them,
+    state changes of a single task are written right away so a restart never
+    mistakes an in flight translation for a queued one
+
+    Failed tasks are the ones that won't be retried anymore, they act as a dead
+    letter store so the scanner doesn't queue them again for a while
+
+    Spilled tasks didn't fit in the translation queue, only their keys stay in
+    memory until unspill() gives their payloads back to be queued
+    """
+
+    def __init__(self, path: str, batch_size: int = 200):
+        self.path = path
+        self.batch_size = batch_size
+        self.conn: sqlite3.Connection | None = None
+        self.pending: List[Tuple[str, str, str, float]] = []
+        # Last known state of in flight, succeeded and failed tasks, checked by the scanner for every candidate
+        self.recent: dict[str, Tuple[str, float]] = {}
+        self.spilled: set[str] = set()
+
+    def open(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS tasks ("
+            "key TEXT PRIMARY KEY, state TEXT NOT NULL, payload TEXT, updated_at REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS tasks_state ON tasks (state)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS tasks_state_updated_at ON tasks (state, updated_at)")
+        self.create_usage_table()
+        self.conn.commit()
+
+        rows = self.conn.execute(
+            "SELECT key, state, updated_at FROM tasks WHERE state IN (?, ?, ?)", SKIPPED_STATES
+        )
+        self.recent = {key: (state, updated_at) for key, state, updated_at in rows}
+        self.spilled = {key for (key,) in self.conn.execute("SELECT key FROM tasks WHERE state = ?", (SPILLED,))}
+
+    def close(self):
+        if self.conn is None:
+            return
+
+        self.flush()
+        self.conn.close()
+        self.conn = None
+
+    def queued(self, tasks: Iterable[Tuple[str, Any]]):
+        """
+        Record tasks as queued, written once enough of them are buffered or on flush()
+
+        Args:
+            tasks (Iterable[Tuple[str, Any]]): Pairs of task key and JSON serializable payload
+        """
+
+        now = time.time()
+        for key, payload in tasks:
+            self.pending.append((key, QUEUED, json.dumps(payload), now))
+            self.recent.pop(key, None)
+            self.spilled.discard(key)
+
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def spill(self, tasks: Iterable[Tuple[str, Any]]):
+        """
+        Record tasks as queued on disk only, they are skipped by the scanner until unspill() gives them back
+
+        Args:
+            tasks (Iterable[Tuple[str, Any]]): Pairs of task key and JSON serializable payload
+        """
+
+        now = time.time()
+        for key, payload in tasks:
+            self.pending.append((key, SPILLED, json.dumps(payload), now))
+            self.recent.pop(key, None)
+            self.spilled.add(key)
+
+        self.flush()
+
+    def unspill(self, limit: int) -> List[Any]:
+        """
+        Get the payloads of the oldest spilled tasks, they are queued again
+
+        Args:
+            limit (int): Most tasks returned
+        """
+
+        self.flush()
+        rows = self.conn.execute(
+            "SELECT key, payload FROM tasks WHERE state = ? ORDER BY updated_at LIMIT ?", (SPILLED, limit)
+        ).fetchall()
+        self.conn.executemany("UPDATE tasks SET state = ? WHERE key = ?", [(QUEUED, key) for key, _ in rows])
+        self.conn.commit()
+        self.spilled.difference_update(key for key, _ in rows)
+        return [json.loads(payload) for _, payload in rows]
+
+    def set_state(self, key: str, state: str):
+        now = time.time()
+        self.pending.append((key, state, None, now))
+        if state in SKIPPED_STATES:
+            self.recent[key] = (state, now)
+        else:
+            self.recent.pop(key, None)
+        self.spilled.discard(key)
+
+        self.flush()
+
+    def flush(self):
+        if self.conn is None or len(self.pending) == 0:
+            return
+
+        self.conn.executemany(
+            "INSERT INTO tasks (key, state, payload, updated_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET state = excluded.state, "
+            "payload = COALESCE(excluded.payload, tasks.payload), updated_at = excluded.updated_at",
+            self.pending,
+        )
+        self.conn.commit()
+        self.pending.clear()
+
+    def resume(self) -> List[Any]:
+        """
+        Get the payloads of the tasks that were still queued when the journal was last closed
+        """
+
+        self.flush()
+        rows = self.conn.execute("SELECT payload FROM tasks WHERE state = ? ORDER BY updated_at", (QUEUED,))
+        return [json.loads(payload) for (payload,) in rows]
+
+    def should_skip(self, key: str, ttls: dict[str, float]) -> bool:
+        """
+        Check if a task is spilled, still being translated, was translated recently or failed recently
+
+        Args:
+            key (str): Task key
+            ttls (dict[str, float]): Seconds a task is skipped for, by state
+        """
+
+        if key in self.spilled:
+            return True
+
+        entry = self.recent.get(key)
+        if entry is None:
+            return False
+
+        state, updated_at = entry
+        return time.time() - updated_at < ttls[state]
+
+    def purge(self, ttls: dict[str, float]):
+        """
+        Forget tasks that are not queued and weren't updated for longer than the ttl of their state
+
+        Args:
+            ttls (dict[str, float]): Seconds tasks are kept, by state
+        """
+
+        self.flush()
+        now = time.time()
+        self.conn.executemany(
+            "DELETE FROM tasks WHERE state = ? AND updated_at < ?",
+            [(state, now - ttl) for state, ttl in ttls.items() if state not in (QUEUED, SPILLED)],
+        )
+        self.conn.commit()
+        self.recent = {key: entry for key, entry in self.recent.items() if now - entry[1] < ttls[entry[0]]}
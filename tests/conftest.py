@@ -0,0 +1,57 @@
+import os
+import sys
+import pytest
+
+# The modules live at the root of the repository, next to main.py
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+# main.py reads its configuration when first imported, the tests always get this one
+MAIN_ENV = {
+    "BAZARR_BASE_URL": "http://bazarr",
+    "BAZARR_API_KEY": "test",
+    "BASE_LANGUAGES": "en",
+    "TO_LANGUAGES": "de,es",
+    "NUM_WORKERS": "2",
+}
+
+def make_task_queue(main):
+    """
+    Empty translation queue built like main.task_queue
+    """
+
+    from unique_queue import AsyncFairQueue
+
+    return AsyncFairQueue(
+        group_fn=lambda x: x.instance,
+        make_queue=main.create_instance_queue,
+        shares={instance.name: instance.num_workers for instance in main.instances},
+    )
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """
+    main.py with a journal in tmp_path, an empty queue, a single replica and no negative cache
+
+    Configuration globals like queue_capacity can be changed with monkeypatch.setattr
+    """
+
+    for name in ("BAZARR_INSTANCES", "COORDINATION_PATH", "QUEUE_CAPACITY", "LANES", "PRIORITY_RULES"):
+        monkeypatch.delenv(name, raising=False)
+    for name, value in MAIN_ENV.items():
+        monkeypatch.setenv(name, value)
+
+    import main
+    from task_journal import TaskJournal
+    from negative_cache import NegativeCache
+    from coordination import LocalCoordinator
+
+    journal = TaskJournal(str(tmp_path / "journal.sqlite3"))
+    journal.open()
+    monkeypatch.setattr(main, "task_journal", journal)
+    monkeypatch.setattr(main, "task_queue", make_task_queue(main))
+    monkeypatch.setattr(main, "negative_cache", NegativeCache(0, 0))
+    monkeypatch.setattr(main, "coordinator", LocalCoordinator())
+    for instance in main.instances:
+        monkeypatch.setattr(instance, "scan_fingerprints", {})
+    yield main
+    journal.close()
@@ -0,0 +1,14 @@
+from class_types import Subtitle, SubtitleTranslate
+
+SOURCE = Subtitle("English", "en", "eng", "/tv/Episode.en.srt", False, True, 50_000)
+
+def test_translation_keeps_flags_of_missing_subtitle():
+    sub = SubtitleTranslate(SOURCE, "de", 1, True, True, forced=True, hi=False)
+    restored = SubtitleTranslate.from_dict(sub.to_dict())
+    assert (restored.forced, restored.hi) == (True, False)
+
+def test_journaled_task_without_flags_uses_source_flags():
+    payload = SubtitleTranslate(SOURCE, "de", 1, True, True).to_dict()
+    del payload["forced"], payload["hi"]
+    restored = SubtitleTranslate.from_dict(payload)
+    assert (restored.forced, restored.hi) == (False, True)
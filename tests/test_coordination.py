@@ -0,0 +1,91 @@
+import time
+import httpx
+import asyncio
+
+from coordination import SqliteCoordinator
+from rate_limiter import SpendBudget
+from task_journal import IN_FLIGHT
+
+EPISODE = {
+    "sonarrEpisodeId": 1,
+    "sonarrSeriesId": 1,
+    "monitored": True,
+    "missing_subtitles": [{"name": "German", "code2": "de", "code3": "deu", "forced": False, "hi": False}],
+}
+SUBTITLES = [{"name": "English", "code2": "en", "code3": "eng", "path": "/tv/1.en.srt", "forced": False, "hi": False, "file_size": 1000}]
+
+def bazarr(request: httpx.Request) -> httpx.Response:
+    match request.url.path:
+        case "/api/episodes/wanted":
+            return httpx.Response(200, json={"data": [EPISODE]})
+        case "/api/episodes":
+            return httpx.Response(200, json={"data": [{**EPISODE, "subtitles": SUBTITLES}]})
+    return httpx.Response(404)
+
+def test_claims_are_exclusive_between_replicas(tmp_path):
+    path = str(tmp_path / "coordination.sqlite3")
+    first, second = SqliteCoordinator(path, "first", 60), SqliteCoordinator(path, "second", 60)
+    first.open()
+    second.open()
+    try:
+        assert first.claim("key")
+        assert not second.claim("key")
+        first.release("key")
+        assert second.claim("key")
+    finally:
+        first.close()
+        second.close()
+
+def test_budget_is_shared_between_replicas(tmp_path):
+    path = str(tmp_path / "coordination.sqlite3")
+    first, second = SqliteCoordinator(path, "first", 60), SqliteCoordinator(path, "second", 60)
+    first.open()
+    second.open()
+    try:
+        first_budget = SpendBudget(first, daily_count=2)
+        second_budget = SpendBudget(second, daily_count=2)
+        first_budget.record(100)
+        assert second_budget.seconds_until_allowed(100) == 0
+        second_budget.record(100)
+        assert first_budget.seconds_until_allowed(100) > 0
+        assert second_budget.seconds_until_allowed(100) > 0
+    finally:
+        first.close()
+        second.close()
+
+def test_work_of_stopped_replica_is_taken_over(app, tmp_path, monkeypatch):
+    path = str(tmp_path / "coordination.sqlite3")
+    # The first replica claims the subtitle and stops without releasing it
+    stopped = SqliteCoordinator(path, "stopped", 0.2)
+    replica = SqliteCoordinator(path, "replica", 60)
+    stopped.open()
+    replica.open()
+    monkeypatch.setattr(app, "coordinator", replica)
+    monkeypatch.setitem(app.journal_ttls, IN_FLIGHT, 0.2)
+    instance = app.instances[0]
+
+    async def scenario():
+        async with httpx.AsyncClient(base_url="http://bazarr", transport=httpx.MockTransport(bazarr)) as client:
+            monkeypatch.setattr(instance, "client", client)
+            assert await app.scan_and_process(instance, True) == 1
+            sub = await app.task_queue.get()
+            key = str(app.key_fn(sub))
+            assert stopped.claim(key)
+
+            # Like the dispatcher, a subtitle claimed by another replica is dropped
+            assert not app.claim_translation(key, sub)
+            app.task_queue.finished(sub)
+            app.task_queue.done(sub)
+            assert await app.scan_and_process(instance, True) == 0
+
+            # Its lease and TRANSLATION_REQUEST_TIMEOUT are over, the next scan queues it again
+            time.sleep(0.3)
+            assert await app.scan_and_process(instance, True) == 1
+            sub = await app.task_queue.get()
+            assert app.claim_translation(key, sub)
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        stopped.conn.close()
+        replica.close()
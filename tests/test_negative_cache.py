@@ -0,0 +1,69 @@
+import json
+import time
+
+from negative_cache import NegativeCache
+
+KEY = ("", True, 1)
+
+def test_entry_expires_after_ttl():
+    cache = NegativeCache(0.05, 10)
+    cache.add(KEY, 42)
+    assert cache.contains(KEY, 42)
+    time.sleep(0.06)
+    assert not cache.contains(KEY, 42)
+    assert len(cache) == 0
+
+def test_fingerprint_change_invalidates_entry():
+    cache = NegativeCache(60, 10)
+    cache.add(KEY, 42)
+    assert not cache.contains(KEY, 43)
+    # Dropped, the old fingerprint doesn't match anymore either
+    assert not cache.contains(KEY, 42)
+
+def test_least_recently_used_evicted_past_max_size():
+    cache = NegativeCache(60, 2)
+    cache.add(("", True, 1), 1)
+    cache.add(("", True, 2), 2)
+    # Used, so the second one is now the least recently used
+    assert cache.contains(("", True, 1), 1)
+    cache.add(("", True, 3), 3)
+    assert len(cache) == 2
+    assert not cache.contains(("", True, 2), 2)
+    assert cache.contains(("", True, 1), 1)
+    assert cache.contains(("", True, 3), 3)
+
+def test_disabled_cache_keeps_nothing(tmp_path):
+    path = tmp_path / "negative_cache.json"
+    cache = NegativeCache(0, 10, str(path))
+    cache.add(KEY, 42)
+    cache.save()
+    assert len(cache) == 0
+    assert not path.exists()
+
+def test_save_and_load_round_trip(tmp_path):
+    path = str(tmp_path / "negative_cache.json")
+    cache = NegativeCache(60, 10, path)
+    cache.add(("4k", False, 7), 1)
+    cache.add(("", True, 8), 2)
+    cache.save()
+
+    loaded = NegativeCache(60, 10, path)
+    loaded.load()
+    # JSON has lists, keys must come back as the same tuples
+    assert list(loaded.entries) == [("4k", False, 7), ("", True, 8)]
+    assert loaded.contains(("4k", False, 7), 1)
+    assert loaded.contains(("", True, 8), 2)
+
+def test_load_skips_expired_and_keeps_most_recent(tmp_path):
+    path = tmp_path / "negative_cache.json"
+    now = time.time()
+    path.write_text(json.dumps([
+        [["", True, 1], 1, now - 1],
+        [["", True, 2], 2, now + 60],
+        [["", True, 3], 3, now + 60],
+        [["", True, 4], 4, now + 60],
+    ]))
+
+    cache = NegativeCache(60, 2, str(path))
+    cache.load()
+    assert list(cache.entries) == [("", True, 3), ("", True, 4)]
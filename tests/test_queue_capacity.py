@@ -0,0 +1,69 @@
+import time
+import asyncio
+
+from conftest import make_task_queue
+from class_types import Subtitle, SubtitleTranslate
+from task_journal import TaskJournal
+
+SOURCE = Subtitle("English", "en", "eng", "/tv/Episode.en.srt", False, False, 50_000)
+
+def make_subs(video_ids) -> list[SubtitleTranslate]:
+    return [SubtitleTranslate(SOURCE, "de", video_id, True, True) for video_id in video_ids]
+
+def keys(app, subs) -> set[str]:
+    return {str(app.key_fn(sub)) for sub in subs}
+
+def test_overflow_is_spilled(app, monkeypatch):
+    monkeypatch.setattr(app, "queue_capacity", 2)
+    subs = make_subs(range(5))
+    assert app.queue_subtitles_for_translation(subs) == 5
+    assert len(app.task_queue) == 2
+    assert app.task_journal.spilled == keys(app, subs[2:])
+
+def test_spilled_keys_are_skipped(app, monkeypatch):
+    monkeypatch.setattr(app, "queue_capacity", 1)
+    subs = make_subs(range(3))
+    app.queue_subtitles_for_translation(subs)
+    # Not in the queue, the journal keeps the scanner from queueing them again
+    assert not any(app.task_queue.check_many([app.key_fn(sub) for sub in subs[1:]]))
+    assert all(app.task_journal.should_skip(key, app.journal_ttls) for key in keys(app, subs[1:]))
+
+def test_refill_at_half_capacity_oldest_first(app, monkeypatch):
+    monkeypatch.setattr(app, "queue_capacity", 4)
+    app.queue_subtitles_for_translation(make_subs(range(6)))
+    time.sleep(0.01)
+    app.queue_subtitles_for_translation(make_subs(range(6, 8)))
+    oldest, newest = make_subs(range(4, 6)), make_subs(range(6, 8))
+
+    async def take():
+        sub = await app.task_queue.get()
+        app.task_queue.finished(sub)
+        app.task_queue.done(sub)
+        app.refill_queue()
+
+    # Above half capacity nothing comes back
+    asyncio.run(take())
+    assert len(app.task_queue) == 3
+    assert len(app.task_journal.spilled) == 4
+
+    asyncio.run(take())
+    assert len(app.task_queue) == 4
+    assert app.task_queue.check_many([app.key_fn(sub) for sub in oldest]) == [True, True]
+    assert app.task_journal.spilled == keys(app, newest)
+
+def test_resume_spills_past_capacity(app, monkeypatch):
+    app.queue_subtitles_for_translation(make_subs(range(5)))
+    app.task_journal.close()
+
+    # Restarted with a smaller queue
+    journal = TaskJournal(app.task_journal.path)
+    monkeypatch.setattr(app, "task_journal", journal)
+    monkeypatch.setattr(app, "task_queue", make_task_queue(app))
+    monkeypatch.setattr(app, "queue_capacity", 2)
+    try:
+        app.resume_from_journal()
+        assert len(app.task_queue) == 2
+        assert len(journal.spilled) == 3
+        assert journal.resume() == [sub.to_dict() for sub in make_subs(range(2))]
+    finally:
+        journal.close()
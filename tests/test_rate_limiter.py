@@ -0,0 +1,55 @@
+import asyncio
+
+from rate_limiter import CircuitBreaker
+
+def open_breaker(cooldown: float) -> CircuitBreaker:
+    breaker = CircuitBreaker(threshold=1, cooldown=cooldown)
+    breaker.record(False)
+    assert breaker.is_open
+    return breaker
+
+def test_released_trial_lets_next_request_through():
+    async def scenario():
+        breaker = open_breaker(0)
+        assert await breaker.acquire()
+
+        # The trial ended with a permanent error, the breaker stays open for the next trial
+        waiting = asyncio.create_task(breaker.acquire())
+        await asyncio.sleep(0.01)
+        assert not waiting.done()
+        breaker.release_trial()
+        assert await asyncio.wait_for(waiting, timeout=1)
+        assert breaker.is_open
+
+    asyncio.run(scenario())
+
+def test_trial_success_closes_breaker():
+    async def scenario():
+        breaker = open_breaker(0)
+        assert await breaker.acquire()
+        waiting = asyncio.create_task(breaker.acquire())
+        await asyncio.sleep(0.01)
+        breaker.record(True)
+        assert not await asyncio.wait_for(waiting, timeout=1)
+        assert not breaker.is_open
+
+    asyncio.run(scenario())
+
+def test_trial_failure_restarts_cooldown():
+    async def scenario():
+        breaker = open_breaker(0.05)
+        await asyncio.sleep(0.06)
+        assert await breaker.acquire()
+        breaker.record(False)
+        assert breaker.is_open and not breaker.trial
+        # No request goes through before the new cooldown is over
+        opened_at = breaker.opened_at
+        assert await asyncio.wait_for(breaker.acquire(), timeout=1)
+        assert breaker.opened_at == opened_at
+
+    asyncio.run(scenario())
+
+def test_release_without_trial_is_noop():
+    breaker = CircuitBreaker(threshold=2, cooldown=1)
+    breaker.release_trial()
+    assert not breaker.is_open and not breaker.trial
@@ -0,0 +1,39 @@
+import pytest
+
+from scan_scheduler import ScanSchedule, next_scan_time
+
+def test_delay_doubles_without_work_up_to_ceiling():
+    schedule = ScanSchedule(60, 300, jitter=0)
+    assert [schedule.next_delay(False) for _ in range(5)] == [120, 240, 300, 300, 300]
+
+def test_work_resets_delay():
+    schedule = ScanSchedule(60, 300, jitter=0)
+    schedule.next_delay(False)
+    schedule.next_delay(False)
+    assert schedule.next_delay(True) == 60
+    assert schedule.next_delay(False) == 120
+
+def test_ceiling_never_below_min_interval():
+    schedule = ScanSchedule(60, 30, jitter=0)
+    assert schedule.next_delay(False) == 60
+
+def test_jitter_stays_within_bounds():
+    schedule = ScanSchedule(100, 100, jitter=0.1)
+    delays = [schedule.next_delay(True) for _ in range(1000)]
+    assert all(90 <= delay <= 110 for delay in delays)
+    # Spread both ways, not a constant offset
+    assert min(delays) < 95 and max(delays) > 105
+
+@pytest.mark.parametrize("started, delay, now, expected", [
+    # Scan shorter than the interval, nothing skipped
+    (100, 60, 130, (160, 0)),
+    # Scan ending right on the next start skips it
+    (100, 60, 160, (220, 1)),
+    # Scan running into two intervals skips both
+    (100, 60, 250, (280, 2)),
+    # An interval of 0 scans again right away, however long the scan took
+    (100, 0, 250, (100, 0)),
+    (100, 0, 100, (100, 0)),
+])
+def test_next_scan_time(started, delay, now, expected):
+    assert next_scan_time(started, delay, now) == expected
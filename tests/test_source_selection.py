@@ -0,0 +1,51 @@
+import pytest
+
+from class_types import Subtitle, MissingSubtitle
+from source_selection import SourceSelector, SOURCE_RULES
+
+def source(code2: str, size: int, forced: bool = False, hi: bool = False) -> Subtitle:
+    flags = "".join(flag for flag, on in ((".forced", forced), (".hi", hi)) if on)
+    return Subtitle(code2, code2, code2, f"/tv/Episode.{code2}{flags}.srt", forced, hi, size)
+
+def missing(code2: str = "de", forced: bool = False, hi: bool = False) -> MissingSubtitle:
+    return MissingSubtitle(code2, code2, code2, forced, hi)
+
+EN = source("en", 1000)
+EN_BIG = source("en", 5000)
+EN_FORCED = source("en", 500, forced=True)
+EN_HI = source("en", 2000, hi=True)
+FR_BIG = source("fr", 9000)
+EN_TINY = source("en", 10)
+
+@pytest.mark.parametrize("rules, base_languages, min_size, sources, wanted, expected", [
+    # forced: same forced flag first, even when smaller
+    (["forced", "size"], ["en"], 0, [EN, EN_FORCED], missing(forced=True), EN_FORCED),
+    (["forced", "size"], ["en"], 0, [EN, EN_FORCED], missing(), EN),
+    # language: BASE_LANGUAGES order, even against a bigger source
+    (["language", "size"], ["en", "fr"], 0, [FR_BIG, EN], missing(), EN),
+    (["language", "size"], ["fr", "en"], 0, [FR_BIG, EN], missing(), FR_BIG),
+    # hi: same hearing impaired flag first
+    (["hi", "size"], ["en"], 0, [EN, EN_HI], missing(), EN),
+    (["hi", "size"], ["en"], 0, [EN, EN_HI], missing(hi=True), EN_HI),
+    # size: biggest first
+    (["size"], ["en"], 0, [EN, EN_BIG], missing(), EN_BIG),
+    # The first rule wins over the next ones
+    (["size", "language"], ["en", "fr"], 0, [EN, FR_BIG], missing(), FR_BIG),
+    # Default rules: a missing forced subtitle takes the forced source over a base language listed first
+    (list(SOURCE_RULES), ["fr", "en"], 0, [FR_BIG, EN_FORCED], missing(forced=True), EN_FORCED),
+    # MIN_SOURCE_SIZE drops small sources, none left gives None
+    (["size"], ["en"], 100, [EN_TINY, EN], missing(), EN),
+    (["size"], ["en"], 100, [EN_TINY], missing(), None),
+    # Languages outside BASE_LANGUAGES are never used
+    (["size"], ["en"], 0, [FR_BIG, EN], missing(), EN),
+    # Never from the language being translated in
+    (["size"], ["en", "fr"], 0, [FR_BIG, EN], missing("fr"), EN),
+    (["size"], ["en"], 0, [], missing(), None),
+])
+def test_select(rules, base_languages, min_size, sources, wanted, expected):
+    selector = SourceSelector(base_languages, rules, min_size)
+    assert selector.select(selector.index(sources), wanted) is expected
+
+def test_index_groups_usable_sources_by_language():
+    selector = SourceSelector(["en", "fr"], list(SOURCE_RULES), 100)
+    assert selector.index([EN, EN_TINY, FR_BIG, source("ja", 5000), EN_HI]) == {"en": [EN, EN_HI], "fr": [FR_BIG]}
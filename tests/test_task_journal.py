@@ -0,0 +1,71 @@
+import time
+
+from task_journal import TaskJournal, QUEUED, IN_FLIGHT, SUCCEEDED, FAILED, SPILLED
+
+TTLS = {QUEUED: float("inf"), SPILLED: float("inf"), IN_FLIGHT: 60, SUCCEEDED: 60, FAILED: 60}
+
+def reopen(journal: TaskJournal) -> TaskJournal:
+    journal.close()
+    journal = TaskJournal(journal.path)
+    journal.open()
+    return journal
+
+def test_queued_tasks_resume_after_restart(tmp_path):
+    journal = TaskJournal(str(tmp_path / "journal.sqlite3"), batch_size=100)
+    journal.open()
+    # Under batch_size, only written by close()
+    journal.queued([("a", {"id": 1}), ("b", {"id": 2}), ("c", {"id": 3})])
+    journal.set_state("b", IN_FLIGHT)
+    journal = reopen(journal)
+    try:
+        assert journal.resume() == [{"id": 1}, {"id": 3}]
+    finally:
+        journal.close()
+
+def test_finished_states_are_skipped_for_their_ttl(tmp_path):
+    journal = TaskJournal(str(tmp_path / "journal.sqlite3"))
+    journal.open()
+    journal.queued([(key, {"key": key}) for key in ("queued", "in_flight", "succeeded", "failed")])
+    journal.set_state("in_flight", IN_FLIGHT)
+    journal.set_state("succeeded", SUCCEEDED)
+    journal.set_state("failed", FAILED)
+    journal = reopen(journal)
+    try:
+        assert not journal.should_skip("queued", TTLS)
+        assert not journal.should_skip("unknown", TTLS)
+        for key in ("in_flight", "succeeded", "failed"):
+            assert journal.should_skip(key, TTLS)
+            # Past its ttl the scanner queues it again
+            assert not journal.should_skip(key, {**TTLS, IN_FLIGHT: 0, SUCCEEDED: 0, FAILED: 0})
+    finally:
+        journal.close()
+
+def test_purge_keeps_queued_and_spilled(tmp_path):
+    journal = TaskJournal(str(tmp_path / "journal.sqlite3"))
+    journal.open()
+    journal.queued([("queued", {"key": "queued"}), ("succeeded", {"key": "succeeded"})])
+    journal.spill([("spilled", {"key": "spilled"})])
+    journal.set_state("succeeded", SUCCEEDED)
+    time.sleep(0.01)
+    journal.purge({QUEUED: 0, SPILLED: 0, IN_FLIGHT: 0, SUCCEEDED: 0, FAILED: 0})
+    journal = reopen(journal)
+    try:
+        states = dict(journal.conn.execute("SELECT key, state FROM tasks"))
+        assert states == {"queued": QUEUED, "spilled": SPILLED}
+        assert journal.spilled == {"spilled"}
+        assert journal.unspill(10) == [{"key": "spilled"}]
+        assert not journal.should_skip("succeeded", TTLS)
+    finally:
+        journal.close()
+
+def test_usage_survives_restart(tmp_path):
+    journal = TaskJournal(str(tmp_path / "journal.sqlite3"))
+    journal.open()
+    journal.add_usage(["day:2025-01-31", "month:2025-01"], 1, 100)
+    journal.add_usage(["day:2025-01-31", "month:2025-01"], 1, 50)
+    journal = reopen(journal)
+    try:
+        assert journal.get_usage("day:2025-01-31") == (2, 150)
+        assert journal.get_usage("day:2025-02-01") == (0, 0)
+    finally:
+        journal.close()
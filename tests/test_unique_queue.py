@@ -0,0 +1,96 @@
+import time
+import asyncio
+
+from unique_queue import AsyncUniqueQueue, AsyncUniquePriorityQueue, AsyncFairQueue
+
+def make_priority_queue(max_wait: float = 0) -> AsyncUniquePriorityQueue:
+    # Items are (name, priority)
+    return AsyncUniquePriorityQueue(key_fn=lambda x: x[0], priority_fn=lambda x: x[1], max_wait=max_wait)
+
+def take(queue, count: int) -> list:
+    async def scenario():
+        return [(await queue.get())[0] for _ in range(count)]
+
+    return asyncio.run(scenario())
+
+def test_priority_order():
+    queue = make_priority_queue()
+    queue.put_many([("c", 3), ("a", 1), ("b", 2)])
+    assert take(queue, 3) == ["a", "b", "c"]
+
+def test_same_priority_in_insertion_order():
+    queue = make_priority_queue(max_wait=3600)
+    queue.put_many([("first", 1), ("second", 1), ("top", 0), ("third", 1)])
+    assert take(queue, 4) == ["top", "first", "second", "third"]
+
+def test_aged_item_jumps_queue():
+    queue = make_priority_queue(max_wait=0.05)
+    queue.put(("old", 9))
+    time.sleep(0.06)
+    queue.put_many([("new", 0), ("newer", 0)])
+    assert take(queue, 3) == ["old", "new", "newer"]
+
+def test_len_with_items_taken_through_both_structures():
+    queue = make_priority_queue(max_wait=0.05)
+    queue.put(("a", 9))
+    time.sleep(0.06)
+    queue.put_many([("b", 0), ("c", 0), ("d", 5)])
+    assert len(queue) == 4
+
+    # Aged, then the heap
+    assert take(queue, 2) == ["a", "b"]
+    assert len(queue) == 2
+    # Everything aged, the entry taken through the heap is dropped from the age order
+    time.sleep(0.06)
+    assert take(queue, 1) == ["c"]
+    assert len(queue) == 1
+    assert take(queue, 1) == ["d"]
+    assert len(queue) == 0
+    assert not queue.ready()
+
+    # Entries left marked in the heap don't come out again
+    queue.put(("e", 1))
+    assert len(queue) == 1
+    assert take(queue, 1) == ["e"]
+    assert len(queue) == 0
+
+def make_lanes(steal: bool) -> AsyncFairQueue:
+    queue = AsyncFairQueue(
+        group_fn=lambda x: x[0],
+        make_queue=lambda group: AsyncUniqueQueue(key_fn=lambda x: x),
+        shares={"ja": 1, "de": 2},
+        steal=steal,
+    )
+    queue.put_many([(lang, i) for i in range(8) for lang in ("ja", "de")])
+    return queue
+
+def test_shares_without_steal():
+    async def scenario():
+        queue = make_lanes(False)
+        taken = [(await queue.get())[0] for _ in range(3)]
+        assert sorted(taken) == ["de", "de", "ja"]
+        assert not queue.ready()
+
+    asyncio.run(scenario())
+
+def test_steal_spreads_over_lanes_past_share():
+    async def scenario():
+        queue = make_lanes(True)
+        taken = [(await queue.get())[0] for _ in range(7)]
+        # Past the shares, every lane gets one more item in turn
+        assert taken.count("ja") == 3
+        assert taken.count("de") == 4
+        assert queue.busy == {"ja": 3, "de": 4}
+
+    asyncio.run(scenario())
+
+def test_steal_prefers_lane_under_share():
+    async def scenario():
+        queue = make_lanes(True)
+        taken = [await queue.get() for _ in range(3)]
+        queue.finished(next(item for item in taken if item[0] == "de"))
+        # A lane back under its share is served before anything is stolen
+        assert (await queue.get())[0] == "de"
+        assert queue.busy == {"ja": 1, "de": 2}
+
+    asyncio.run(scenario())
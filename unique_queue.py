@@ -1,39 +1,316 @@
 from collections import deque
-import threading
+import time
+import heapq
+import asyncio
+import itertools
+
+class AsyncUniqueQueue:
+    """
+    Queue that drops items whose key is already queued or being processed
+
+    Meant to be used from a single event loop, a key stays known from put()
+    until done() is called for it, so it can't be queued twice meanwhile
+    """
 
-class UniqueQueue:
     def __init__(self, key_fn):
         self.q = deque()
         self.seen = set()
-        self.lock = threading.Lock()
-        self.not_empty = threading.Condition(self.lock)
+        self.not_empty = asyncio.Event()
         self.key_fn = key_fn
 
-    def put(self, item):
+    def __len__(self):
+        return len(self.q)
+
+    @property
+    def keys(self) -> int:
+        return len(self.seen)
+
+    def ready(self) -> bool:
+        """
+        Whether get() would give out an item right away
+        """
+
+        return len(self) > 0
+
+    def _push(self, item):
+        self.q.append(item)
+
+    def _pop(self):
+        return self.q.popleft()
+
+    def put(self, item) -> bool:
         key = self.key_fn(item)
-        with self.lock:
-            if key not in self.seen:
-                self.q.append(item)
-                self.seen.add(key)
-                self.not_empty.notify()
-
-    def get(self):
-        with self.not_empty:
-            while not self.q:
-                self.not_empty.wait()
-            item = self.q.popleft()
-            return item
-        
+        if key in self.seen:
+            return False
+
+        self._push(item)
+        self.seen.add(key)
+        self.not_empty.set()
+        return True
+
+    def put_many(self, items) -> list:
+        """
+        put() for a batch, returns the items that were queued
+        """
+
+        key_fn = self.key_fn
+        seen = self.seen
+        added = []
+        for item in items:
+            key = key_fn(item)
+            if key in seen:
+                continue
+
+            self._push(item)
+            seen.add(key)
+            added.append(item)
+
+        if len(added) > 0:
+            self.not_empty.set()
+        return added
+
+    async def get(self):
+        while len(self) == 0:
+            await self.not_empty.wait()
+        item = self._pop()
+        if len(self) == 0:
+            self.not_empty.clear()
+        return item
+
+    def requeue(self, item):
+        """
+        Put back an item given out by get() whose done() wasn't called yet, it keeps its key
+        """
+
+        self._push(item)
+        self.not_empty.set()
+
+    def finished(self, item):
+        # Nothing to release, see AsyncFairQueue.finished
+        pass
+
     def done(self, item):
         key = self.key_fn(item)
-        with self.lock:
-            if key in self.seen:
-                self.seen.remove(key)
-            else:
+        if key in self.seen:
+            self.seen.remove(key)
+        else:
+            raise ValueError("done() called on unknown item")
+
+    def done_many(self, items):
+        key_fn = self.key_fn
+        seen = self.seen
+        for item in items:
+            key = key_fn(item)
+            if key not in seen:
                 raise ValueError("done() called on unknown item")
-                
-        
+            seen.remove(key)
+
     def check(self, item):
-        key = self.key_fn(item)
-        with self.lock:
-            return key in self.seen
\ No newline at end of file
+        return self.key_fn(item) in self.seen
+
+    def check_many(self, keys) -> list[bool]:
+        """
+        Whether each key is known, takes keys rather than items so callers don't build items to check
+        """
+
+        seen = self.seen
+        return [key in seen for key in keys]
+
+class AsyncUniquePriorityQueue(AsyncUniqueQueue):
+    """
+    AsyncUniqueQueue that gives out the item with the lowest priority_fn(item) first
+
+    Items with the same priority come out in insertion order, an item waiting for
+    longer than max_wait seconds is given out first regardless of its priority so
+    low priority items can't starve, 0 disables that
+    """
+
+    def __init__(self, key_fn, priority_fn, max_wait: float = 0):
+        super().__init__(key_fn)
+        self.priority_fn = priority_fn
+        self.max_wait = max_wait
+        self.heap = []
+        # Same entries in insertion order, the oldest one is checked against max_wait
+        self.by_age = deque()
+        self.counter = itertools.count()
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def _push(self, item):
+        # Entry: [priority, insertion order, insertion time, item, taken]
+        entry = [self.priority_fn(item), next(self.counter), time.monotonic(), item, False]
+        heapq.heappush(self.heap, entry)
+        if self.max_wait > 0:
+            self.by_age.append(entry)
+        self.size += 1
+
+    def _pop(self):
+        # Entries taken through the other structure are only marked and dropped lazily
+        entry = None
+        if self.max_wait > 0:
+            while self.by_age[0][4]:
+                self.by_age.popleft()
+            if time.monotonic() - self.by_age[0][2] >= self.max_wait:
+                entry = self.by_age.popleft()
+
+        if entry is None:
+            entry = heapq.heappop(self.heap)
+            while entry[4]:
+                entry = heapq.heappop(self.heap)
+
+        entry[4] = True
+        self.size -= 1
+        return entry[3]
+
+class AsyncFairQueue:
+    """
+    One unique queue per group, given out round robin so a big group can't starve the others
+
+    get() skips groups already having share items given out and not finished yet,
+    finished() must be called for every item given out, whether done() or requeue()
+    follows or not, and groups with no share set have default_share, 0 for no limit
+
+    With steal, groups past their share are still served when no group under its share has
+    anything to give out, the one the least past its share first, so shares only matter
+    when groups compete and the extra items are spread over the groups
+
+    The queue of a group can be another AsyncFairQueue, to share a group between subgroups
+
+    Args:
+        group_fn: Function giving the group of an item
+        make_queue: Function creating the queue of a group, an AsyncUniqueQueue or AsyncFairQueue
+        shares (dict[str, int]): Maximum items of each group given out at the same time
+        default_share (int): Share of the groups not in shares (default: 0)
+        steal (bool): Serve groups past their share when nothing else can be (default: False)
+    """
+
+    def __init__(self, group_fn, make_queue, shares: dict[str, int] | None = None, default_share: int = 0, steal: bool = False):
+        self.group_fn = group_fn
+        self.make_queue = make_queue
+        self.shares = shares or {}
+        self.default_share = default_share
+        self.steal = steal
+        self.queues: dict[str, AsyncUniqueQueue] = {}
+        self.busy: dict[str, int] = {}
+        # Groups in the order they are served, the one served goes to the back
+        self.order = deque()
+        self.changed = asyncio.Event()
+
+    def __len__(self):
+        return sum(len(queue) for queue in self.queues.values())
+
+    @property
+    def keys(self) -> int:
+        return sum(queue.keys for queue in self.queues.values())
+
+    def queue(self, group: str) -> AsyncUniqueQueue:
+        queue = self.queues.get(group)
+        if queue is None:
+            queue = self.queues[group] = self.make_queue(group)
+            self.busy[group] = 0
+            self.order.append(group)
+        return queue
+
+    def available(self, group: str) -> bool:
+        share = self.shares.get(group, self.default_share)
+        return (share <= 0 or self.busy[group] < share) and self.queues[group].ready()
+
+    def ready(self) -> bool:
+        return any(self.available(group) for group in self.order) or (
+            self.steal and any(queue.ready() for queue in self.queues.values())
+        )
+
+    def put(self, item) -> bool:
+        if not self.queue(self.group_fn(item)).put(item):
+            return False
+        self.changed.set()
+        return True
+
+    def groups(self, items) -> dict[str, list]:
+        groups: dict[str, list] = {}
+        group_fn = self.group_fn
+        for item in items:
+            group = group_fn(item)
+            batch = groups.get(group)
+            if batch is None:
+                batch = groups[group] = []
+            batch.append(item)
+        return groups
+
+    def put_many(self, items) -> list:
+        """
+        put() for a batch, returns the items that were queued
+        """
+
+        added = []
+        for group, batch in self.groups(items).items():
+            added.extend(self.queue(group).put_many(batch))
+        if len(added) > 0:
+            self.changed.set()
+        return added
+
+    async def get(self):
+        while True:
+            for _ in range(len(self.order)):
+                group = self.order[0]
+                self.order.rotate(-1)
+                if self.available(group):
+                    self.busy[group] += 1
+                    return await self.queues[group].get()
+
+            # Every group with something to give out is past its share, take from the one
+            # least past it, ties go round robin so stolen items are spread over the groups
+            if self.steal:
+                best = None
+                best_over = None
+                for group in self.order:
+                    if self.queues[group].ready():
+                        over = self.busy[group] - self.shares.get(group, self.default_share)
+                        if best_over is None or over < best_over:
+                            best, best_over = group, over
+                if best is not None:
+                    self.order.remove(best)
+                    self.order.append(best)
+                    self.busy[best] += 1
+                    return await self.queues[best].get()
+
+            self.changed.clear()
+            await self.changed.wait()
+
+    def requeue(self, item):
+        self.queue(self.group_fn(item)).requeue(item)
+        self.changed.set()
+
+    def finished(self, item):
+        group = self.group_fn(item)
+        self.busy[group] -= 1
+        self.queues[group].finished(item)
+        self.changed.set()
+
+    def done(self, item):
+        self.queue(self.group_fn(item)).done(item)
+
+    def done_many(self, items):
+        for group, batch in self.groups(items).items():
+            self.queue(group).done_many(batch)
+
+    def check(self, item):
+        return self.queue(self.group_fn(item)).check(item)
+
+    def check_many(self, keys) -> list[bool]:
+        """
+        Whether each key is known, in the order of keys, group_fn must work on keys too
+        """
+
+        keys = list(keys)
+        positions: dict[str, list[int]] = {}
+        for i, key in enumerate(keys):
+            positions.setdefault(self.group_fn(key), []).append(i)
+
+        results = [False] * len(keys)
+        for group, indexes in positions.items():
+            for i, found in zip(indexes, self.queue(group).check_many([keys[i] for i in indexes])):
+                results[i] = found
+        return results
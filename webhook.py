@@ -0,0 +1,118 @@
+import hmac
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Iterable
+from http_server import HttpServer, Request, Response
+
+logger = logging.getLogger("bazarr_lingarr")
+
+def extract_video_ids(payload: Any) -> tuple[set[int], set[int]]:
+    """
+    Get the episode ids (sonarrEpisodeId) and movie ids (radarrId) a webhook payload is about
+
+    Understands Sonarr payloads (episodes[].id), Radarr payloads (movie.id) and a generic
+    payload with episode_ids and/or movie_ids lists, Sonarr and Radarr test events are ignored
+
+    Args:
+        payload (Any): Decoded JSON body of the webhook
+    """
+
+    episode_ids: set[int] = set()
+    movie_ids: set[int] = set()
+    if not isinstance(payload, dict) or payload.get("eventType") == "Test":
+        return episode_ids, movie_ids
+
+    def add_ids(ids: set[int], values: Iterable[Any]):
+        for value in values:
+            if isinstance(value, int) and not isinstance(value, bool):
+                ids.add(value)
+
+    # Sonarr
+    episodes = payload.get("episodes")
+    if isinstance(episodes, list):
+        add_ids(episode_ids, (episode.get("id") for episode in episodes if isinstance(episode, dict)))
+
+    # Radarr
+    movie = payload.get("movie")
+    if isinstance(movie, dict):
+        add_ids(movie_ids, [movie.get("id")])
+
+    # Generic, like what a Bazarr custom post-processing script would send
+    for key, ids in (("episode_ids", episode_ids), ("movie_ids", movie_ids)):
+        values = payload.get(key)
+        if isinstance(values, list):
+            add_ids(ids, values)
+    add_ids(episode_ids, [payload.get("sonarrEpisodeId")])
+    add_ids(movie_ids, [payload.get("radarrId")])
+
+    return episode_ids, movie_ids
+
+class WebhookCoalescer:
+    """
+    Group the videos of webhooks received within a short window into a single targeted scan
+
+    Args:
+        window (float): Seconds to wait after the first webhook before scanning
+        scan (Callable): Coroutine called with the episode ids and movie ids to scan
+    """
+
+    def __init__(self, window: float, scan: Callable[[set[int], set[int]], Awaitable[None]]):
+        self.window = window
+        self.scan = scan
+        self.episode_ids: set[int] = set()
+        self.movie_ids: set[int] = set()
+        self.task: asyncio.Task | None = None
+
+    def add(self, episode_ids: set[int], movie_ids: set[int]):
+        self.episode_ids |= episode_ids
+        self.movie_ids |= movie_ids
+        if self.task is None:
+            self.task = asyncio.create_task(self.flush_later())
+
+    async def flush_later(self):
+        try:
+            await asyncio.sleep(self.window)
+        finally:
+            self.task = None
+
+        episode_ids, self.episode_ids = self.episode_ids, set()
+        movie_ids, self.movie_ids = self.movie_ids, set()
+        try:
+            await self.scan(episode_ids, movie_ids)
+        except Exception as e:
+            logger.error("Error while scanning videos from webhook: %s", e)
+
+    async def close(self):
+        if self.task is not None:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+
+def add_webhook_route(server: HttpServer, coalescer: WebhookCoalescer, token: str | None = None, path: str = "/webhook"):
+    """
+    Serve POST on path, accepting Sonarr, Radarr and generic payloads
+
+    Args:
+        server (HttpServer): Server to add the route to
+        coalescer (WebhookCoalescer): Where the videos of the payloads are sent
+        token (str, optional): Token required in the token query parameter or the X-Webhook-Token header
+        path (str): Path of the route (default: /webhook)
+    """
+
+    async def handle_webhook(request: Request) -> Response:
+        if token:
+            given = request.headers.get("x-webhook-token") or request.query.get("token", [""])[0]
+            if not hmac.compare_digest(given.encode(), token.encode()):
+                return Response(401, "Invalid token")
+
+        try:
+            payload = request.json()
+        except ValueError:
+            return Response(400, "Invalid JSON")
+
+        episode_ids, movie_ids = extract_video_ids(payload)
+        logger.info("Webhook received for %d episodes and %d movies", len(episode_ids), len(movie_ids))
+        if episode_ids or movie_ids:
+            coalescer.add(episode_ids, movie_ids)
+        return Response(202, "Accepted")
+
+    server.route("POST", path, handle_webhook)